@@ -1,104 +1,305 @@
+import os
+import shutil
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+
+# Répertoire du cache des cours (None pour désactiver)
+CACHE_DIR = '.cache_asset'
+
+# Titres à poids fixe des stratégies, exclus par défaut de la sélection par dividendes
+EXCLUDED_STOCKS = ('SNTS', 'ORAC', 'SGBC', 'ECOC')
+
+
+def _exclusion_key(excluded):
+    """Liste d'exclusion normalisée (clé des classements mémoïsés)"""
+    return tuple(sorted(set(EXCLUDED_STOCKS if excluded is None else excluded)))
+
+
+def file_digest(source):
+    """Empreinte SHA-256 du contenu d'un fichier (chemin ou fichier uploadé)"""
+    if hasattr(source, 'getvalue'):
+        content = source.getvalue()
+    elif hasattr(source, 'read'):
+        position = source.tell()
+        content = source.read()
+        source.seek(position)
+    else:
+        with open(source, 'rb') as f:
+            content = f.read()
+    return hashlib.sha256(content).hexdigest()
+
 
 class Asset2:
-    def __init__(self, price_file: str, dividend_file: str):
+    def __init__(self, price_file: str, dividend_file: str, cache_dir=CACHE_DIR):
         """Initialisation de la classe avec chargement des prix et dividendes"""
+        # Chargement des prix (cache colonnaire si le classeur est déjà connu)
+        self.price_hash = file_digest(price_file)
+        self.data, self.prices = self._load_prices(price_file, cache_dir)
+        
+        # Séparation du benchmark BRVM-C (et niveaux en tableau pour les métriques)
+        self.benchmark_data = self.data[['BRVM C']]
+        self.benchmark = self.data['BRVM C'].to_numpy(dtype=np.float64)
+        
+        # Accès matriciel: ordre fixe des titres et position de chaque date
+        self.tickers = [c for c in self.data.columns if c != 'BRVM C']
+        self.ticker_index = {stock: j for j, stock in enumerate(self.tickers)}
+        self.dates = self.data.index
+        self.date_index = {date: i for i, date in enumerate(self.dates)}
+        
+        # Chargement de la table des dividendes (ISIN, Date) -> Montant, Div Yield
+        self.dividend_report = self.load_dividends(dividend_file)
+        self._build_dividend_matrices()
+        
+        # Calendrier de sélection mémoïsé: (date, n) -> classement
+        self._yield_rankings = {}
+        self._screening_calendar = {}
+        
+        # Matrices de volatilité glissante par taille de fenêtre (en mois)
+        self._volatility_matrices = {}
+        self._return_matrix = None
+
+    def _load_prices(self, price_file, cache_dir):
+        """Chargement des prix depuis le cache ou, à défaut, depuis le classeur Excel
+        
+        Renvoie le DataFrame des cours et la matrice contiguë des prix (hors BRVM-C)."""
+        cache_path = os.path.join(cache_dir, self.price_hash) if cache_dir else None
+        if cache_path and os.path.isdir(cache_path):
+            try:
+                return self._read_price_cache(cache_path)
+            except (OSError, ValueError) as e:
+                print(f"Cache des prix illisible, relecture du classeur: {str(e)}")
+        
         # Chargement et préparation des données de prix
-        self.data = pd.read_excel(price_file)
-        self.data['Date'] = pd.to_datetime(self.data['Date'])
+        data = pd.read_excel(price_file)
+        data['Date'] = pd.to_datetime(data['Date'])
+        data = data.set_index('Date')
         
-        # Séparation et indexation du benchmark BRVM-C
-        self.benchmark_data = self.data[['Date', 'BRVM C']].set_index('Date')
-        self.data = self.data.set_index('Date')
+        # Conversion des prix en format numérique
+        price_columns = data.columns.difference(['BRVM C'])
+        data[price_columns] = data[price_columns].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+        data['BRVM C'] = pd.to_numeric(data['BRVM C'], errors='coerce').astype(np.float64)
+        prices = np.ascontiguousarray(data[[c for c in data.columns if c != 'BRVM C']].to_numpy(dtype=np.float64))
         
-        # Conversion des prix en format numérique (sans BRVM-C)
-        price_columns = self.data.columns.difference(['BRVM C'])
-        self.data[price_columns] = self.data[price_columns].apply(pd.to_numeric, errors='coerce')
+        if cache_path:
+            try:
+                self._write_price_cache(data, prices, cache_path)
+            except OSError as e:
+                print(f"Impossible d'écrire le cache des prix: {str(e)}")
+        return data, prices
+
+    @staticmethod
+    def _write_price_cache(data, prices, cache_path):
+        """Écriture de la matrice des prix et du BRVM-C au format .npy"""
+        parent = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(parent, exist_ok=True)
         
-        # Initialisation du dictionnaire des dividendes
-        self.dividends_data = defaultdict(lambda: defaultdict(dict))
-        self.load_dividends(dividend_file)
+        # Écriture dans un répertoire temporaire puis renommage atomique
+        tmp_path = tempfile.mkdtemp(dir=parent)
+        try:
+            np.save(os.path.join(tmp_path, 'prices.npy'), prices)
+            np.save(os.path.join(tmp_path, 'benchmark.npy'), data['BRVM C'].to_numpy(dtype=np.float64))
+            np.save(os.path.join(tmp_path, 'dates.npy'), data.index.values)
+            np.save(os.path.join(tmp_path, 'columns.npy'), np.array([str(c) for c in data.columns]))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(cache_path):
+                raise
+
+    @staticmethod
+    def _read_price_cache(cache_path):
+        """Lecture du cache des prix, la matrice étant projetée en mémoire (memory-map)"""
+        prices = np.load(os.path.join(cache_path, 'prices.npy'), mmap_mode='r')
+        benchmark = np.load(os.path.join(cache_path, 'benchmark.npy'), mmap_mode='r')
+        dates = np.load(os.path.join(cache_path, 'dates.npy'))
+        columns = np.load(os.path.join(cache_path, 'columns.npy')).tolist()
+        
+        tickers = [c for c in columns if c != 'BRVM C']
+        data = pd.DataFrame(prices, index=pd.DatetimeIndex(dates, name='Date'),
+                            columns=tickers, copy=False)
+        data.insert(columns.index('BRVM C'), 'BRVM C', benchmark)
+        return data, prices
 
     
     def load_dividends(self, dividend_file):
-        """Chargement des dividendes depuis le fichier Excel multi-feuilles"""
+        """Chargement des dividendes depuis le fichier Excel multi-feuilles
+        
+        Toutes les feuilles sont lues en une passe puis validées par masques.
+        Renvoie le rapport des lignes rejetées (feuille, ligne, motif)."""
+        self.dividends = pd.DataFrame(
+            {'Montant': pd.Series(dtype=np.float64), 'Div Yield': pd.Series(dtype=np.float64)},
+            index=pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=['ISIN', 'Date'])
+        )
+        report = pd.DataFrame(columns=['Feuille', 'Ligne', 'ISIN', 'Date', 'Montant', 'Div Yield', 'Motif'])
+        
         try:
-            xls = pd.ExcelFile(dividend_file)
-        
-            # Parcours de chaque feuille du fichier Excel
-            for sheet_name in xls.sheet_names:
-                # Lecture de la feuille avec parsing des dates
-                df = pd.read_excel(
-                   dividend_file,
-                   sheet_name=sheet_name
-                )
+            sheets = pd.read_excel(dividend_file, sheet_name=None)
+            frames = [
+                df.assign(Feuille=sheet_name, Ligne=df.index + 2)
+                for sheet_name, df in sheets.items() if not df.empty
+            ]
+            if not frames:
+                return report
+            raw = pd.concat(frames, ignore_index=True)
             
-                # Conversion des dates avec format DD/MM/YYYY
-                df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
+            # Conversion vectorielle des dates (format DD/MM/YYYY) et des montants
+            dates = pd.to_datetime(raw['Date'], format='%d/%m/%Y', errors='coerce')
+            amounts = pd.to_numeric(raw['Montant'], errors='coerce')
+            yields = pd.to_numeric(raw['Div Yield'], errors='coerce')
             
-                # Vérification et nettoyage des dates invalides
-                df = df[pd.notna(df['Date'])]
+            # Motifs de rejet (le premier motif rencontré est retenu)
+            reasons = pd.Series(None, index=raw.index, dtype=object)
+            reasons = reasons.mask(raw['Div Yield'].notna() & yields.isna(), 'Rendement invalide')
+            reasons = reasons.mask(amounts.isna(), 'Montant invalide')
+            reasons = reasons.mask(raw['ISIN'].isna(), 'ISIN manquant')
+            reasons = reasons.mask(dates.isna(), 'Date invalide')
+            invalid = reasons.notna()
             
-                # Stockage des dividendes par titre et par date
-                for _, row in df.iterrows():
-                    try:
-                        if pd.notna(row['Date']) and pd.notna(row['Montant']):
-                            self.dividends_data[row['ISIN']][row['Date']] = {
-                               'montant': float(row['Montant']),
-                               'yield': float(row['Div Yield'])
-                           }
-                    except Exception as e:
-                       print(f"Erreur lors du traitement de la ligne: {row}")
-                       print(f"Error: {str(e)}")
-                    continue
+            report = raw.loc[invalid, ['Feuille', 'Ligne', 'ISIN', 'Date', 'Montant', 'Div Yield']].assign(
+                Motif=reasons[invalid]
+            ).reset_index(drop=True)
+            
+            table = pd.DataFrame({
+                'ISIN': raw['ISIN'].astype(str),
+                'Date': dates,
+                'Montant': amounts.astype(np.float64),
+                'Div Yield': yields.astype(np.float64)
+            })[~invalid]
+            
+            # Doublons (ISIN, Date): dernière valeur lue, rang de première apparition
+            table['Ordre'] = table.groupby(['ISIN', 'Date'], sort=False).ngroup()
+            table = table.drop_duplicates(['ISIN', 'Date'], keep='last').sort_values('Ordre', kind='stable')
+            
+            # Tri stable par ISIN: l'ordre du fichier est conservé pour chaque titre
+            self.dividends = (table.sort_values('ISIN', kind='stable')
+                                   .set_index(['ISIN', 'Date'])[['Montant', 'Div Yield']])
                     
         except Exception as e:
             print(f"Erreur lors du chargement du fichier {dividend_file}")
             print(f"Error: {str(e)}")
+        
+        self._build_dividend_pivot()
+        return report
+
+    def _build_dividend_pivot(self):
+        """Tables ISIN x année du premier versement positif (montant et rendement)"""
+        paid = self.dividends[self.dividends['Montant'] > 0].reset_index()
+        paid['Année'] = paid['Date'].dt.year
+        first_payments = paid.drop_duplicates(['ISIN', 'Année'], keep='first')
+        
+        self.dividend_amounts = first_payments.pivot(index='ISIN', columns='Année', values='Montant')
+        self.dividend_yields = first_payments.pivot(index='ISIN', columns='Année', values='Div Yield')
+        
+        # Grilles alignées sur les colonnes de self.data pour le filtrage vectoriel
+        self._dividend_years = {year: j for j, year in enumerate(self.dividend_yields.columns)}
+        self._amount_grid = self.dividend_amounts.reindex(index=self.data.columns).to_numpy(dtype=np.float64)
+        self._yield_grid = self.dividend_yields.reindex(index=self.data.columns).to_numpy(dtype=np.float64)
+    
     
+    def _build_dividend_matrices(self):
+        """Matrices dates x titres des dividendes par action et des rendements,
+        alignées sur la matrice des prix (0 les jours sans versement)"""
+        self.dividend_matrix = np.zeros_like(self.prices)
+        self.dividend_yield_matrix = np.zeros_like(self.prices)
+        
+        table = self.dividends.reset_index()
+        rows = self.dates.get_indexer(table['Date'])
+        cols = pd.Index(self.tickers).get_indexer(table['ISIN'])
+        aligned = (rows >= 0) & (cols >= 0)
+        self.dividend_matrix[rows[aligned], cols[aligned]] = table['Montant'].to_numpy()[aligned]
+        self.dividend_yield_matrix[rows[aligned], cols[aligned]] = table['Div Yield'].to_numpy()[aligned]
+        
+        # Jours de versement effectif (seuls les montants positifs sont encaissés)
+        self.dividend_days = np.flatnonzero((self.dividend_matrix > 0).any(axis=1))
+        self.dividend_day_mask = np.zeros(len(self.dates), dtype=bool)
+        self.dividend_day_mask[self.dividend_days] = True
     
-    def get_consistent_dividend_payers(self, date):
+    
+    def get_consistent_dividend_payers(self, date, excluded=None):
         """Sélection des titres ayant:
         1. Versé des dividendes sur 2 années consécutives
         2. Une croissance positive du rendement
-        3. Hors SNTS, ORAC, SGBC, ECOC"""
+        3. Hors titres exclus (titres à poids fixe, SNTS, ORAC, SGBC, ECOC par défaut)"""
         
         current_date = pd.to_datetime(date)
-        excluded_stocks = ['SNTS', 'ORAC', 'SGBC', 'ECOC']
-        consistent_payers = []
+        excluded_stocks = list(_exclusion_key(excluded)) + ['BRVM C']
+        
+        # Colonnes des 2 dernières années dans les grilles ISIN x année
+        last_year = self._dividend_years.get(current_date.year - 1)
+        previous_year = self._dividend_years.get(current_date.year - 2)
+        if last_year is None or previous_year is None:
+            return []
+        
+        # Vérification des critères de sélection sur tout l'univers
+        consistent = (~np.isnan(self._amount_grid[:, last_year]) &
+                      ~np.isnan(self._amount_grid[:, previous_year]) &
+                      (self._yield_grid[:, last_year] > self._yield_grid[:, previous_year]) &
+                      ~self.data.columns.isin(excluded_stocks))
+        return self.data.columns[consistent].tolist()
 
-        # Analyse de chaque titre du marché
-        for stock in self.data.columns:
-            if stock in excluded_stocks or stock == 'BRVM C':
-                continue
+    def volatility_matrix(self, months=12):
+        """Matrice dates x titres (colonnes de self.data) de la volatilité annualisée
+        sur les `months` mois précédant chaque date, calculée en une passe
+        
+        Les bornes reprennent calculate_volatility: fenêtre [date - months, date]
+        et rendements calculés à l'intérieur de la fenêtre."""
+        if months not in self._volatility_matrices:
+            if not self.data.index.is_monotonic_increasing:
+                raise ValueError("Les dates de cotation doivent être triées")
+            prices = self.data.to_numpy(dtype=np.float64)
             
-            # Récupération des dividendes des 2 dernières années
-            yearly_dividends = []
-            check_years = [current_date.year - 1, current_date.year - 2]
+            # Rendements quotidiens, centrés par titre pour la stabilité numérique
+            returns = np.full_like(prices, np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = prices[1:] / prices[:-1] - 1
+            finite = np.isfinite(returns)
+            invalid = np.isinf(returns) | (np.isnan(returns) & np.isinf(prices))
+            centered = returns - np.nanmean(np.where(finite, returns, np.nan), axis=0)
+            centered = np.where(finite, centered, 0.0)
             
-            # Recherche des versements de dividendes pour chaque année
-            for year in check_years:
-                year_payment = None
-                for div_date, div_info in self.dividends_data[stock].items():
-                    if div_date.year == year and div_info['montant'] > 0:
-                        year_payment = div_info
-                        break
-                
-                if year_payment:
-                    yearly_dividends.append(year_payment)
+            # Sommes cumulées (ligne 0 = aucun rendement) pour des fenêtres en O(1)
+            zeros = np.zeros((1, prices.shape[1]))
+            count = np.vstack([zeros, np.cumsum(finite, axis=0)])
+            total = np.vstack([zeros, np.cumsum(centered, axis=0)])
+            squares = np.vstack([zeros, np.cumsum(centered ** 2, axis=0)])
+            infinite = np.vstack([zeros, np.cumsum(invalid, axis=0)])
             
-            # Vérification des critères de sélection
-            if (len(yearly_dividends) == 2 and 
-                yearly_dividends[0]['yield'] > yearly_dividends[1]['yield']):
-                consistent_payers.append(stock)
+            # Fenêtre [start, end]: rendements des lignes start+1 à end
+            end = np.arange(len(prices))
+            start = self.data.index.searchsorted(self.data.index - pd.DateOffset(months=months), side='left')
+            start = np.minimum(start, end)
+            n = count[end + 1] - count[start + 1]
+            s1 = total[end + 1] - total[start + 1]
+            s2 = squares[end + 1] - squares[start + 1]
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variance = np.maximum(s2 - s1 ** 2 / n, 0.0) / (n - 1)
+            variance[(n < 2) | (infinite[end + 1] - infinite[start + 1] > 0)] = np.nan
+            self._volatility_matrices[months] = np.sqrt(variance) * np.sqrt(252)  # Annualisation
+        return self._volatility_matrices[months]
 
-        return consistent_payers
+    def return_matrix(self):
+        """Matrice dates x titres (ordre de self.tickers) des rendements quotidiens
+        
+        Première ligne et rendements sans cours disponible à NaN; calculée une fois."""
+        if self._return_matrix is None:
+            returns = np.full_like(self.prices, np.nan, dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = self.prices[1:] / self.prices[:-1] - 1
+            returns[~np.isfinite(returns)] = np.nan
+            self._return_matrix = returns
+        return self._return_matrix
 
     def calculate_volatility(self, stock, date, months=12):
         """Calcul de la volatilité annualisée sur une période donnée"""
         end_date = pd.to_datetime(date)
+        if end_date in self.date_index and self.dates.is_monotonic_increasing:
+            row = self.date_index[end_date]
+            return self.volatility_matrix(months)[row, self.data.columns.get_loc(stock)]
+        
+        # Date hors calendrier de cotation: calcul direct sur la période
         start_date = end_date - pd.DateOffset(months=months)
         
         # Extraction des données sur la période
@@ -110,70 +311,118 @@ class Asset2:
         volatility = returns.std() * np.sqrt(252)  # Annualisation
         return volatility
 
-    def get_top_dividend_stocks(self, date, n=16):
-        """Sélection des meilleurs titres selon:
-        1. Top n par rendement de dividende de l'année précédente
-        2. Tri final par volatilité croissante"""
-        
-        current_date = pd.to_datetime(date)
-        consistent_payers = self.get_consistent_dividend_payers(date)
+    def _top_yield_stocks(self, year, n, excluded=None):
+        """Top n des titres réguliers par rendement de l'année précédente
+        (mémoïsé par année et liste d'exclusion)"""
+        excluded = _exclusion_key(excluded)
+        key = (year, n, excluded)
+        if key not in self._yield_rankings:
+            consistent_payers = self.get_consistent_dividend_payers(pd.Timestamp(year=year, month=1, day=1), excluded)
+            last_year_yields = self.dividend_yields.reindex(index=consistent_payers, columns=[year - 1])
+            yields = [(stock, float(last_year_yields.at[stock, year - 1])) for stock in consistent_payers]
+            self._yield_rankings[key] = sorted(yields, key=lambda x: x[1], reverse=True)[:n]
+        return self._yield_rankings[key]
+
+    def _rank_dividend_stocks(self, date, n, excluded=None):
+        """Classement final par volatilité croissante des n meilleurs rendements"""
+        volatilities = None
+        if date in self.date_index and self.dates.is_monotonic_increasing:
+            volatilities = self.volatility_matrix()[self.date_index[date]]
         
-        # Collecte des métriques pour chaque titre
-        stock_metrics = {}
-        for stock in consistent_payers:
+        stock_metrics = []
+        for stock, div_yield in self._top_yield_stocks(date.year, n, excluded):
             try:
-                # Recherche du dernier dividende
-                last_year = current_date.year - 1
-                last_year_dividend = None
-                
-                # Identification du dividende de l'année précédente
-                for div_date, div_info in self.dividends_data[stock].items():
-                    if div_date.year == last_year and div_info['montant'] > 0:
-                        last_year_dividend = div_info
-                        break
-                
-                if last_year_dividend:
+                if volatilities is not None:
+                    volatility = volatilities[self.data.columns.get_loc(stock)]
+                else:
                     volatility = self.calculate_volatility(stock, date)
-                    stock_metrics[stock] = {
-                        'div_yield': last_year_dividend['yield'],
-                        'volatility': volatility
-                    }
+                stock_metrics.append((stock, {
+                    'div_yield': div_yield,
+                    'volatility': volatility
+                }))
             except:
                 continue
+        return sorted(stock_metrics, key=lambda x: x[1]['volatility'])
+
+    def get_top_dividend_stocks(self, date, n=16, excluded=None):
+        """Sélection des meilleurs titres selon:
+        1. Top n par rendement de dividende de l'année précédente
+        2. Tri final par volatilité croissante
         
-        # Sélection des n meilleurs rendements
-        top_yield_stocks = sorted(stock_metrics.items(), 
-                                key=lambda x: x[1]['div_yield'],
-                                reverse=True)[:n]
-        
-        # Tri final par volatilité croissante
-        final_ranking = sorted(top_yield_stocks, 
-                             key=lambda x: x[1]['volatility'])
-        
-        return {stock: metrics for stock, metrics in final_ranking}
+        excluded: titres écartés de la sélection (titres à poids fixe de la
+        stratégie; EXCLUDED_STOCKS par défaut)
+        Le classement est servi depuis le calendrier de sélection s'il y figure."""
+        current_date = pd.to_datetime(date)
+        excluded = _exclusion_key(excluded)
+        key = (current_date, n, excluded)
+        if key not in self._screening_calendar:
+            self._screening_calendar[key] = self._rank_dividend_stocks(current_date, n, excluded)
+        return {stock: dict(metrics) for stock, metrics in self._screening_calendar[key]}
 
-    def get_stock_data(self, stock, date):
-        """Récupération des données complètes d'un titre à une date donnée"""
+    def build_screening_calendar(self, dates=None, n=16, excluded=None):
+        """Précalcul du classement pour un ensemble de dates (par défaut toutes les dates
+        de cotation), par exemple les dates de rebalancement d'un balayage de paramètres"""
+        dates = self.data.index if dates is None else pd.DatetimeIndex(pd.to_datetime(dates))
+        excluded = _exclusion_key(excluded)
+        for current_date in dates:
+            key = (current_date, n, excluded)
+            if key not in self._screening_calendar:
+                self._screening_calendar[key] = self._rank_dividend_stocks(current_date, n, excluded)
+
+    def get_row(self, date):
+        """Position d'une date de cotation dans la matrice des prix"""
         date = pd.to_datetime(date)
         try:
-            price = self.data.loc[date, stock]
-            dividend_info = self.dividends_data[stock].get(date, {'montant': 0, 'yield': 0})
-            return {
-                'price': price,
-                'dividend': dividend_info['montant'],
-                'div_yield': dividend_info['yield']
-            }
+            return self.date_index[date]
         except KeyError:
+            raise KeyError(f"Aucune donnée disponible pour la date {date}")
+
+    def next_available_date(self, date):
+        """Première date de cotation postérieure ou égale à une date (None si aucune)"""
+        date = pd.to_datetime(date)
+        if self.dates.is_monotonic_increasing:
+            position = self.dates.searchsorted(date, side='left')
+            return self.dates[position] if position < len(self.dates) else None
+        available_dates = self.dates[self.dates >= date]
+        return available_dates[0] if not available_dates.empty else None
+
+    def get_price_row(self, date):
+        """Vue (sans copie) des prix de tous les titres à une date, dans l'ordre de self.tickers"""
+        return self.prices[self.get_row(date)]
+
+    def get_stock_data(self, stock, date):
+        """Récupération des données complètes d'un titre à une date donnée"""
+        date = pd.to_datetime(date)
+        if stock not in self.ticker_index or date not in self.date_index:
             raise KeyError(f"Données non disponibles pour {stock} à la date {date}")
+        row, col = self.date_index[date], self.ticker_index[stock]
+        return {
+            'price': self.prices[row, col],
+            'dividend': self.dividend_matrix[row, col],
+            'div_yield': self.dividend_yield_matrix[row, col]
+        }
+
+    def get_dividend_cash(self, date, stocks, quantities):
+        """Dividendes encaissés à une date pour des quantités détenues
+        (produit scalaire avec la ligne de la matrice des dividendes)"""
+        row = self.get_row(date)
+        if not self.dividend_day_mask[row]:
+            return 0.0
+        dividends = self.dividend_matrix[row, [self.ticker_index[stock] for stock in stocks]]
+        paid = dividends > 0
+        return float(np.dot(quantities[paid], dividends[paid]))
 
     def get_current_prices(self, date):
         """Récupération des prix de tous les titres à une date donnée"""
-        date = pd.to_datetime(date)
-        try:
-            prices = self.data.loc[date]
-            return prices.drop('BRVM C') if 'BRVM C' in prices.index else prices
-        except KeyError:
-            raise KeyError(f"Aucune donnée disponible pour la date {date}")
+        return pd.Series(self.get_price_row(date), index=self.tickers, name=pd.to_datetime(date), copy=False)
+
+    def get_benchmark_values(self, dates):
+        """Niveaux du benchmark BRVM-C aux dates de cotation données, rebasés à 100"""
+        rows = self.dates.get_indexer(pd.DatetimeIndex(dates))
+        if (rows < 0).any():
+            raise KeyError("Dates absentes des cours du benchmark")
+        values = self.benchmark[rows]
+        return 100 * values / values[0]
 
     def get_benchmark_data(self, start_date=None, end_date=None):
         """Récupération des données du benchmark BRVM-C"""
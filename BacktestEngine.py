@@ -0,0 +1,559 @@
+import pickle
+import pandas as pd
+import numpy as np
+from TransactionLog import TransactionLog
+from metrics import performance_metrics, rolling_metrics
+
+
+class BacktestEngine:
+    """Noyau de simulation commun aux stratégies
+
+    Les quantités, prix, valorisations et poids du portefeuille sont des vecteurs
+    NumPy sur un ordre de titres fixe (self.stocks). L'historique des positions est
+    conservé dans des matrices préallouées jours x titres (self.holdings), en
+    float32 si history_dtype=np.float32, et les transactions dans un journal en
+    colonnes (self.transactions). Les DataFrames d'état et de transactions ne sont
+    construits qu'à la demande (get_portfolio_history, get_state, get_transactions).
+
+    En mode événementiel (event_driven=True), les jours sans événement entre deux
+    rééquilibrages sont valorisés d'un bloc: le premier jour de franchissement
+    des bandes est repéré sur tout le segment et le moteur y saute directement.
+    Les jours de dividendes restent traités un par un.
+
+    Les stratégies dérivées définissent:
+    - _initial_allocation(prices): titres, poids cibles, valorisations initiales
+    - _rebalancing_signal(weights, cash, total_value): besoin de rééquilibrage
+      (vectorisé sur le premier axe: un jour ou un segment de jours)
+    - _rebalancing_base(portfolio_value, total_value): base du rééquilibrage
+    - _weight_base(portfolio_value, total_value): base de calcul des poids
+
+    Avec un barème de frais (cost_model, voir costs.CostModel), les frais de
+    chaque transaction sont prélevés dans la boucle: ils réduisent la base
+    investie lors des rééquilibrages et les montants de l'allocation initiale.
+    Sans barème, les frais peuvent être appliqués a posteriori (costs.apply_costs).
+
+    Un backtest terminé peut être sauvegardé (save_checkpoint), rechargé avec des
+    données à jour (load_checkpoint) puis prolongé jusqu'à une date de fin
+    ultérieure (extend): seuls les nouveaux jours sont simulés.
+
+    Les règles étant écrites pour des tableaux, elles servent aussi à la
+    simulation simultanée de variantes (voir BatchBacktest): les paramètres
+    listés dans BATCH_PARAMETERS (seuils du constructeur) et BATCH_STATE
+    (grandeurs déduites de l'allocation initiale) y deviennent des vecteurs par
+    variante et ceux de BATCH_VECTORS des matrices variantes x titres.
+    """
+
+    # Seuil de variation de quantité déclenchant une transaction
+    MIN_QUANTITY_CHANGE = 0.000001
+    
+    # Recherche des frais en boucle (tolérance relative à la base, itérations maximales)
+    COST_TOLERANCE = 1e-12
+    MAX_COST_ITERATIONS = 20
+    
+    # Champs de l'historique des positions (la valorisation en est déduite)
+    HOLDING_FIELDS = ('Quantity', 'Price', 'Weight')
+    
+    # Paramètres scalaires et vecteurs par titre empilés en simulation groupée
+    BATCH_PARAMETERS = ()
+    BATCH_STATE = ()
+    BATCH_VECTORS = ('target_weights',)
+    
+    # Définition du ratio de Sharpe (voir metrics.performance_metrics)
+    SHARPE_METHOD = 'annualized_excess'
+
+    def __init__(self, initial_cash, initial_nav, start_date, end_date, asset,
+                 history_dtype=np.float64, event_driven=False, cost_model=None, run=True,
+                 history=True):
+        """Initialisation de la stratégie de gestion de portefeuille
+        (run=False: portefeuille initialisé sans exécuter le backtest, voir iter_days;
+        history=False: seul le portefeuille du premier jour est calculé, sans
+        historique ni journal ni exécution, voir BatchBacktest)"""
+        # Paramètres initiaux
+        self.initial_cash = initial_cash
+        self.initial_nav = initial_nav
+        self.start_date = pd.to_datetime(start_date)
+        self.end_date = pd.to_datetime(end_date)
+        self.asset = asset
+        self.cash = initial_cash
+        self.history_dtype = np.dtype(history_dtype)
+        self.event_driven = event_driven
+        self.cost_model = cost_model
+        self._rolling_metrics = {}
+
+        # Dates disponibles
+        self.available_dates = self.asset.dates
+        self.start_date = self._get_next_available_date(self.start_date)
+        if self.start_date is None:
+            raise ValueError("Aucune date valide trouvée")
+
+        # Structure du portefeuille
+        self.portfolio = {
+            'Date': [],              # Dates de valorisation
+            'NAV': [],              # Valeurs liquidatives
+            'Total_Value': [],      # Valorisations totales
+            'Portfolio_Value': [],  # Valorisation sans cash
+            'Cash': [],            # Niveau de cash
+            'Cash_Injections': [],  # Injections de cash
+            'Dividends': [],        # Dividendes collectés
+            'Costs': []             # Frais de transaction prélevés
+        }
+
+        # Démarrage du backtest
+        if not history:
+            self.initial_portfolio_value = self._initial_state()[2]
+            return
+        self._initialize_portfolio()
+        if run:
+            self._run_backtest()
+
+    def _get_next_available_date(self, date):
+        """Trouve la prochaine date disponible"""
+        return self.asset.next_available_date(date)
+
+    def _weight_base(self, portfolio_value, total_value):
+        """Base de calcul des poids (valorisation hors cash par défaut)"""
+        return portfolio_value
+
+    def _initial_state(self):
+        """Portefeuille du premier jour: titres, poids cibles et quantités
+        (sans historique ni journal)
+
+        Renvoie les prix, valorisations, valorisation hors cash et frais d'acquisition."""
+        try:
+            prices = self.asset.get_current_prices(self.start_date)
+            stocks, target_weights, values, portfolio_value = self._initial_allocation(prices)
+
+            # Ordre fixe des titres détenus et colonnes dans la matrice des prix
+            self.stocks = list(stocks)
+            self._columns = np.array([self.asset.ticker_index[stock] for stock in self.stocks], dtype=np.intp)
+            self.target_weights = np.asarray(target_weights, dtype=np.float64)
+
+            current_prices = prices.to_numpy(dtype=np.float64)[self._columns]
+            values = np.asarray(values, dtype=np.float64)
+            
+            # Frais d'acquisition prélevés sur les montants investis
+            costs = self._trade_costs(values)
+            if costs:
+                values = values * (1 - costs / values.sum())
+                portfolio_value -= costs
+            self.quantities = values / current_prices
+            return current_prices, values, portfolio_value, costs
+
+        except Exception as e:
+            raise ValueError(f"Erreur d'initialisation: {str(e)}")
+
+    def _initialize_portfolio(self):
+        """Initialisation du portefeuille au premier jour"""
+        current_prices, values, portfolio_value, costs = self._initial_state()
+        try:
+            self._allocate_history(1 + len(self._backtest_dates()))
+            self.transactions = TransactionLog(self.stocks)
+
+            # Transactions initiales
+            self.transactions.append(self.start_date, np.arange(len(self.stocks)), 'Acquisition',
+                                     self.quantities, current_prices, values)
+
+            # Enregistrement initial
+            self._record_portfolio_state(
+                date=self.start_date,
+                state=(self.quantities, current_prices, self.target_weights),
+                portfolio_value=portfolio_value,
+                dividends=0,
+                costs=costs
+            )
+
+        except Exception as e:
+            raise ValueError(f"Erreur d'initialisation: {str(e)}")
+
+    def _update_portfolio(self, current_date):
+        """Mise à jour quotidienne du portefeuille"""
+        try:
+            # 1. Revalorisation aux prix du jour (quantités inchangées)
+            prices = self.asset.prices[self.asset.get_row(current_date), self._columns]
+            prev_total_value = self.portfolio['Total_Value'][-1]
+            values = self.quantities * prices
+            portfolio_value = np.nansum(values)
+
+            # 2. Collecte des dividendes
+            dividends_collected = self.asset.get_dividend_cash(current_date, self.stocks, self.quantities)
+            self.cash += dividends_collected
+
+            # 3. Valorisation totale avec cash et poids courants
+            total_value = portfolio_value + self.cash
+            weights = values / self._weight_base(portfolio_value, total_value)
+
+            # 4. Rééquilibrage si nécessaire
+            cash_injection = 0
+            costs = 0.0
+            if self._rebalancing_signal(weights, self.cash, total_value):
+                base_value, cash_injection, portfolio_value = self._rebalancing_base(portfolio_value, total_value)
+                costs = self._rebalance(current_date, base_value, prices, values, weights)
+                portfolio_value -= costs
+                total_value -= costs
+
+            # 5. Enregistrement de l'état final
+            self._record_portfolio_state(
+                date=current_date,
+                state=(self.quantities, prices, weights),
+                portfolio_value=portfolio_value,
+                total_value=total_value,
+                prev_total_value=prev_total_value,
+                cash_injection=cash_injection,
+                dividends=dividends_collected,
+                costs=costs
+            )
+
+        except Exception as e:
+            print(f"Erreur de mise à jour ({current_date}): {str(e)}")
+            raise
+
+    def _trade_costs(self, traded_values):
+        """Frais de transaction du barème en boucle (0 sans barème)"""
+        if self.cost_model is None:
+            return 0.0
+        return float(np.sum(self.cost_model.trade_costs(traded_values)))
+
+    def _rebalance(self, date, base_value, prices, values, weights):
+        """Ramène chaque titre à son poids cible sur la base donnée
+
+        Avec un barème de frais, les montants investis sont réduits des frais
+        des ajustements (point fixe: les frais dépendent des montants échangés). Met à jour
+        quantités, valorisations et poids en place et inscrit les ajustements
+        au journal. Renvoie les frais prélevés."""
+        costs = 0.0
+        invested_weight = self.target_weights.sum()
+        for _ in range(self.MAX_COST_ITERATIONS):
+            target_values = (base_value - costs / invested_weight) * self.target_weights
+            new_quantities = target_values / prices
+            quantity_diff = new_quantities - self.quantities
+            traded = np.abs(quantity_diff) > self.MIN_QUANTITY_CHANGE
+            
+            new_costs = self._trade_costs(quantity_diff[traded] * prices[traded])
+            converged = abs(new_costs - costs) <= self.COST_TOLERANCE * abs(base_value)
+            costs = new_costs
+            if converged:
+                break
+
+        self.transactions.append(date, np.flatnonzero(traded), 'Ajustement', quantity_diff[traded],
+                                 prices[traded], np.abs(quantity_diff[traded] * prices[traded]))
+        self.quantities[traded] = new_quantities[traded]
+        values[traded] = target_values[traded]
+        weights[traded] = self.target_weights[traded]
+        return costs
+
+    def _record_portfolio_state(self, date, state, portfolio_value,
+                              total_value=None, prev_total_value=None,
+                              cash_injection=0, dividends=0, costs=0.0):
+        """Enregistrement de l'état du portefeuille
+        
+        state: vecteurs (quantités, prix, poids) dans l'ordre de self.stocks"""
+        day = len(self.portfolio['Date'])
+        self._ensure_history_capacity(day + 1)
+        for field, values in zip(self.HOLDING_FIELDS, state):
+            self.holdings[field][day] = values
+        
+        self.portfolio['Date'].append(date)
+        self.portfolio['Portfolio_Value'].append(portfolio_value)
+
+        total_value = total_value or (portfolio_value + self.cash)
+        self.portfolio['Total_Value'].append(total_value)
+        self.portfolio['Cash'].append(self.cash)
+        self.portfolio['Cash_Injections'].append(cash_injection)
+        self.portfolio['Dividends'].append(dividends)
+        self.portfolio['Costs'].append(costs)
+
+        # Mise à jour de la VL
+        prev_nav = self.portfolio['NAV'][-1] if self.portfolio['NAV'] else self.initial_nav
+        prev_total_value = prev_total_value or self.initial_cash
+        new_nav = prev_nav * (total_value / prev_total_value)
+        self.portfolio['NAV'].append(new_nav)
+
+    def _allocate_history(self, n_days):
+        """Préallocation des matrices jours x titres de l'historique des positions"""
+        self.holdings = {
+            field: np.full((n_days, len(self.stocks)), np.nan, dtype=self.history_dtype)
+            for field in self.HOLDING_FIELDS
+        }
+
+    def _ensure_history_capacity(self, n_days):
+        """Agrandit les matrices de l'historique si nécessaire (capacité doublée)"""
+        capacity = len(self.holdings['Quantity'])
+        if n_days <= capacity:
+            return
+        new_capacity = max(n_days, 2 * capacity)
+        for field, history in self.holdings.items():
+            grown = np.full((new_capacity, history.shape[1]), np.nan, dtype=history.dtype)
+            grown[:capacity] = history
+            self.holdings[field] = grown
+
+    def _backtest_dates(self, after=None):
+        """Dates de cotation simulées après la date de début (ou après `after`)"""
+        after = self.start_date if after is None else after
+        return self.available_dates[
+            (self.available_dates > after) &
+            (self.available_dates <= self.end_date)
+        ]
+
+    def _run_backtest(self, backtest_dates=None):
+        """Exécution du backtest (toute la période par défaut)"""
+        if backtest_dates is None:
+            backtest_dates = self._backtest_dates()
+        if self.event_driven:
+            self._run_event_driven(backtest_dates)
+            return
+        
+        for date in backtest_dates:
+            try:
+                self._update_portfolio(date)
+            except Exception as e:
+                print(f"Erreur lors du backtest à la date {date}: {str(e)}")
+                raise
+
+    def _run_event_driven(self, backtest_dates):
+        """Exécution par segments: saut direct au prochain événement
+        (jour de dividende ou premier jour de rééquilibrage)"""
+        rows = self.asset.dates.get_indexer(backtest_dates)
+        dividend_positions = np.flatnonzero(self.asset.dividend_day_mask[rows])
+        
+        position = 0
+        while position < len(backtest_dates):
+            date = backtest_dates[position]
+            try:
+                if not self.asset.dividend_day_mask[rows[position]]:
+                    # Segment sans dividende jusqu'au prochain jour de versement
+                    next_dividend = np.searchsorted(dividend_positions, position)
+                    end = dividend_positions[next_dividend] if next_dividend < len(dividend_positions) \
+                        else len(backtest_dates)
+                    position += self._advance_segment(backtest_dates[position:end], rows[position:end])
+                    if position == end:
+                        continue
+                    date = backtest_dates[position]
+                
+                # Événement: jour de dividende ou de rééquilibrage
+                self._update_portfolio(date)
+                position += 1
+            except Exception as e:
+                print(f"Erreur lors du backtest à la date {date}: {str(e)}")
+                raise
+
+    def _advance_segment(self, dates, rows):
+        """Valorisation d'un bloc de jours à positions constantes
+        
+        Enregistre les jours précédant le premier franchissement des conditions
+        de rééquilibrage et renvoie leur nombre."""
+        prices = self.asset.prices[rows][:, self._columns]
+        values = self.quantities * prices
+        portfolio_value = np.nansum(values, axis=1)
+        total_value = portfolio_value + self.cash
+        weights = values / self._weight_base(portfolio_value, total_value)[:, None]
+        
+        # Premier jour de franchissement (bandes de poids, seuils de cash)
+        signal = np.asarray(self._rebalancing_signal(weights, self.cash, total_value))
+        quiet_days = int(np.argmax(signal)) if signal.any() else len(dates)
+        if quiet_days == 0:
+            return 0
+        
+        # Enregistrement en bloc des jours sans événement
+        day = len(self.portfolio['Date'])
+        self._ensure_history_capacity(day + quiet_days)
+        self.holdings['Quantity'][day:day + quiet_days] = self.quantities
+        self.holdings['Price'][day:day + quiet_days] = prices[:quiet_days]
+        self.holdings['Weight'][day:day + quiet_days] = weights[:quiet_days]
+        
+        portfolio_value = portfolio_value[:quiet_days]
+        total_value = total_value[:quiet_days]
+        prev_total_value = np.concatenate([[self.portfolio['Total_Value'][-1]], total_value[:-1]])
+        prev_total_value = np.where(prev_total_value == 0, self.initial_cash, prev_total_value)
+        nav = np.multiply.accumulate(np.concatenate([[self.portfolio['NAV'][-1]], total_value / prev_total_value]))
+        
+        self.portfolio['Date'].extend(dates[:quiet_days])
+        self.portfolio['Portfolio_Value'].extend(portfolio_value.tolist())
+        self.portfolio['Total_Value'].extend(total_value.tolist())
+        self.portfolio['Cash'].extend([self.cash] * quiet_days)
+        self.portfolio['Cash_Injections'].extend([0] * quiet_days)
+        self.portfolio['Dividends'].extend([0.0] * quiet_days)
+        self.portfolio['Costs'].extend([0.0] * quiet_days)
+        self.portfolio['NAV'].extend(nav[1:].tolist())
+        return quiet_days
+
+    def iter_days(self, end_date=None, keep_history=True):
+        """Générateur: simule les jours suivant la dernière date simulée et renvoie,
+        pour chaque jour, date, VL, valorisation, cash, dividendes, frais et transactions
+
+        end_date: date de fin ultérieure éventuelle (voir extend)
+        keep_history=False: seul le dernier jour est conservé (mémoire constante);
+        l'historique et le journal des transactions ne sont alors plus disponibles.
+
+        L'arrêt de l'itération laisse le portefeuille dans l'état du dernier jour
+        renvoyé: le backtest peut être repris (iter_days, extend) plus tard."""
+        if end_date is not None:
+            end_date = pd.to_datetime(end_date)
+            if end_date < self.end_date:
+                raise ValueError(f"La nouvelle date de fin ({end_date}) précède la date de fin actuelle ({self.end_date})")
+            self.end_date = end_date
+        
+        for date in self._backtest_dates(after=self.portfolio['Date'][-1]):
+            if not keep_history:
+                self._discard_history()
+            try:
+                self._update_portfolio(date)
+            except Exception as e:
+                print(f"Erreur lors du backtest à la date {date}: {str(e)}")
+                raise
+            yield {
+                'Date': date,
+                'NAV': self.portfolio['NAV'][-1],
+                'Total_Value': self.portfolio['Total_Value'][-1],
+                'Cash': self.portfolio['Cash'][-1],
+                'Cash_Injections': self.portfolio['Cash_Injections'][-1],
+                'Dividends': self.portfolio['Dividends'][-1],
+                'Costs': self.portfolio['Costs'][-1],
+                'Transactions': self.transactions.on(date)
+            }
+
+    def _discard_history(self):
+        """Ne conserve que le dernier jour de l'historique et vide le journal des transactions"""
+        day = len(self.portfolio['Date']) - 1
+        for values in self.portfolio.values():
+            del values[:-1]
+        self.holdings = {field: history[day:day + 1].copy() for field, history in self.holdings.items()}
+        self.transactions = TransactionLog(self.stocks)
+
+    def extend(self, end_date):
+        """Prolonge le backtest jusqu'à une date de fin ultérieure
+        (seuls les jours postérieurs à la dernière date simulée sont calculés)"""
+        end_date = pd.to_datetime(end_date)
+        if end_date < self.end_date:
+            raise ValueError(f"La nouvelle date de fin ({end_date}) précède la date de fin actuelle ({self.end_date})")
+        self.end_date = end_date
+        self._run_backtest(self._backtest_dates(after=self.portfolio['Date'][-1]))
+        return self
+
+    def __getstate__(self):
+        """État sérialisable: sans les données de marché (Asset2), historique limité aux jours simulés"""
+        state = self.__dict__.copy()
+        n_days = len(self.portfolio['Date'])
+        state['asset'] = None
+        state['available_dates'] = None
+        state['holdings'] = {field: history[:n_days].copy() for field, history in self.holdings.items()}
+        return state
+
+    def save_checkpoint(self, path):
+        """Sauvegarde de l'état du backtest (positions, cash, VL, historiques et journal)"""
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load_checkpoint(cls, path, asset):
+        """Rechargement d'un backtest sauvegardé avec les données de marché `asset`
+
+        Les cours de la dernière date simulée doivent être ceux du point de reprise."""
+        with open(path, 'rb') as f:
+            strategy = pickle.load(f)
+        if not isinstance(strategy, cls):
+            raise ValueError(f"Le point de reprise n'est pas un backtest {cls.__name__}")
+
+        strategy.asset = asset
+        strategy.available_dates = asset.dates
+
+        # Cohérence des données: dernière date disponible et cours inchangés
+        last_date = strategy.portfolio['Date'][-1]
+        if last_date not in asset.date_index:
+            raise KeyError(f"Date de reprise absente des données: {last_date}")
+        day = len(strategy.portfolio['Date']) - 1
+        prices = asset.prices[asset.date_index[last_date], strategy._columns]
+        recorded = strategy.holdings['Price'][day].astype(np.float64)
+        if not np.allclose(prices, recorded, rtol=1e-6, equal_nan=True):
+            raise ValueError(f"Les cours du {last_date} diffèrent de ceux du point de reprise")
+        return strategy
+
+    def _day_positions(self, dates=None):
+        """Positions dans l'historique des dates demandées (toutes si None)"""
+        if dates is None:
+            return np.arange(len(self.portfolio['Date']))
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        positions = pd.DatetimeIndex(self.portfolio['Date']).get_indexer(dates)
+        if (positions < 0).any():
+            raise KeyError(f"Dates absentes de l'historique: {list(dates[positions < 0])}")
+        return positions
+
+    def get_holdings_history(self, field='Weight'):
+        """Historique jours x titres d'un champ (Quantity, Price, Value ou Weight)"""
+        n_days = len(self.portfolio['Date'])
+        if field == 'Value':
+            data = (self.holdings['Quantity'][:n_days].astype(np.float64) *
+                    self.holdings['Price'][:n_days].astype(np.float64))
+        else:
+            data = self.holdings[field][:n_days]
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.portfolio['Date'], name='Date'),
+                            columns=self.stocks)
+
+    def _state_frame(self, day):
+        """DataFrame d'état d'un jour (titres x Quantity, Price, Value, Weight)"""
+        quantities = self.holdings['Quantity'][day].astype(np.float64)
+        prices = self.holdings['Price'][day].astype(np.float64)
+        return pd.DataFrame({
+            'Quantity': quantities,
+            'Price': prices,
+            'Value': quantities * prices,
+            'Weight': self.holdings['Weight'][day].astype(np.float64)
+        }, index=self.stocks)
+
+    def get_state(self, date):
+        """État du portefeuille à une date de l'historique"""
+        return self._state_frame(self._day_positions([date])[0])
+
+    def get_portfolio_history(self, dates=None):
+        """Renvoie l'historique du portefeuille (complet, ou limité aux dates demandées);
+        les états ne sont construits que pour les dates renvoyées"""
+        positions = self._day_positions(dates)
+        history = pd.DataFrame({
+            key: self.portfolio[key]
+            for key in ['Date', 'NAV', 'Total_Value', 'Cash', 'Cash_Injections', 'Dividends']
+        }).iloc[positions].reset_index(drop=True)
+        history['State'] = [self._state_frame(day) for day in positions]
+        history['Transactions'] = [self.transactions.on(date) for date in history['Date']]
+        return history
+
+    def get_transactions(self, start_date=None, end_date=None):
+        """Journal des transactions (format long) sur une période, complet par défaut"""
+        return self.transactions.to_frame(start_date, end_date)
+
+    def get_turnover(self):
+        """Rotation quotidienne: valorisation ajustée rapportée à l'actif total du jour"""
+        total_value = pd.Series(self.portfolio['Total_Value'],
+                                index=pd.DatetimeIndex(self.portfolio['Date'], name='Date'))
+        traded_value = self.transactions.traded_value(by='Date').reindex(total_value.index, fill_value=0.0)
+        return (traded_value / total_value).rename('Turnover')
+
+    def get_performance_metrics(self):
+        """Calcul des métriques de performance (face au BRVM-C sur les dates simulées)"""
+        benchmark = self.asset.get_benchmark_values(self.portfolio['Date'])
+        metrics = performance_metrics(self.portfolio['NAV'], benchmark, sharpe_method=self.SHARPE_METHOD)
+        return {
+            **metrics,
+            'Total Dividendes': sum(self.portfolio['Dividends']),
+            'Total Injections': sum(self.portfolio['Cash_Injections']),
+            'Nombre Rebalancements': self.transactions.rebalance_count()
+        }
+
+    def get_rolling_metrics(self, window=63):
+        """Volatilité, Sharpe, beta et tracking error glissants sur `window` jours
+        de cotation, drawdown courant et maximal (dates x métriques)
+
+        Mémoïsé par taille de fenêtre tant que l'historique n'est pas prolongé."""
+        key = (window, len(self.portfolio['Date']))
+        if key not in self._rolling_metrics:
+            benchmark = self.asset.get_benchmark_values(self.portfolio['Date'])
+            metrics = rolling_metrics(self.portfolio['NAV'], benchmark, window, sharpe_method=self.SHARPE_METHOD)
+            self._rolling_metrics[key] = pd.DataFrame(
+                metrics, index=pd.DatetimeIndex(self.portfolio['Date'], name='Date'))
+        return self._rolling_metrics[key]
+
+    def get_nav_series(self):
+        """Renvoie la série temporelle des VL"""
+        return pd.Series(
+            data=self.portfolio['NAV'],
+            index=self.portfolio['Date'],
+            name='Valeur Liquidative'
+        )
@@ -0,0 +1,245 @@
+import pandas as pd
+import numpy as np
+from metrics import performance_metrics, max_drawdown
+
+
+class BatchBacktest:
+    """Simulation simultanée de variantes de paramètres d'une stratégie
+
+    Le portefeuille du premier jour est calculé par la stratégie elle-même, sans
+    historique ni journal (history=False), une seule fois par jeu de paramètres
+    d'allocation: les seuils (BATCH_PARAMETERS) ne modifiant pas le portefeuille
+    initial, les variantes qui ne diffèrent que par eux le partagent. Quantités,
+    cash et VL de toutes les variantes sont ensuite empilés en tableaux
+    variantes x titres et avancés ensemble sur la matrice des prix de Asset2.
+    Les règles de la stratégie (_rebalancing_signal, _rebalancing_base,
+    _weight_base) sont appliquées une seule fois par jour à toutes les variantes;
+    les rééquilibrages ne modifient que les variantes signalées (mise à jour
+    masquée).
+
+    Les titres sont l'union des portefeuilles des variantes: un titre absent
+    d'une variante y a une quantité et un poids cible nuls.
+
+    Exemple:
+        batch = BatchBacktest(Strategy2, [{'drift_tolerance': 0.01},
+                                          {'drift_tolerance': 0.03}],
+                              90000000, 100, '2024-01-01', '2025-04-30', asset)
+        nav = batch.get_nav_frame()
+    """
+
+    def __init__(self, strategy_class, variants, initial_cash, initial_nav,
+                 start_date, end_date, asset):
+        """Initialisation des variantes et exécution de la simulation groupée"""
+        # Paramètres initiaux
+        self.strategy_class = strategy_class
+        self.variants = [dict(params) for params in variants]
+        if not self.variants:
+            raise ValueError("Aucune variante à simuler")
+        if any(params.get('cost_model') is not None for params in self.variants):
+            raise ValueError("Les frais en boucle (cost_model) ne sont pas gérés en simulation groupée")
+        self.initial_cash = initial_cash
+        self.initial_nav = initial_nav
+        self.end_date = pd.to_datetime(end_date)
+        self.asset = asset
+        self.MIN_QUANTITY_CHANGE = strategy_class.MIN_QUANTITY_CHANGE
+
+        # Portefeuilles initiaux calculés par la stratégie
+        portfolios, groups = self._initial_portfolios(start_date, end_date)
+        self.start_date = portfolios[0].start_date
+        backtest_dates = portfolios[0]._backtest_dates()
+        self._stack_variants(portfolios, groups)
+        del portfolios  # libérés avant la simulation
+
+        # Démarrage de la simulation
+        self._run_backtest(backtest_dates)
+
+    def _initial_portfolios(self, start_date, end_date):
+        """Portefeuilles du premier jour (history=False), un par jeu de paramètres
+        d'allocation (paramètres hors BATCH_PARAMETERS)
+
+        Renvoie les portefeuilles et, pour chaque variante, la position du sien."""
+        portfolios, keys, groups = [], {}, []
+        for params in self.variants:
+            allocation = {name: value for name, value in params.items()
+                          if name not in self.strategy_class.BATCH_PARAMETERS}
+            key = repr(sorted(allocation.items()))
+            if key not in keys:
+                keys[key] = len(portfolios)
+                portfolios.append(self.strategy_class(
+                    self.initial_cash, self.initial_nav, start_date, end_date,
+                    self.asset, history=False, **allocation
+                ))
+            groups.append(keys[key])
+        return portfolios, groups
+
+    def _day_prices(self, day, row):
+        """Prix du jour des titres (communs à toutes les variantes)"""
+        return self.asset.prices[row, self._columns]
+
+    @staticmethod
+    def _slots(stocks):
+        """Lignes d'un portefeuille: (titre, rang de l'occurrence du titre)"""
+        seen = {}
+        slots = []
+        for stock in stocks:
+            slots.append((stock, seen.get(stock, 0)))
+            seen[stock] = seen.get(stock, 0) + 1
+        return slots
+
+    def _stack_variants(self, portfolios, groups):
+        """Empilement des portefeuilles initiaux en tableaux variantes x titres
+        (groups: position du portefeuille de chaque variante)"""
+        # Union des lignes dans l'ordre d'apparition: un titre présent deux fois dans
+        # un portefeuille y occuperait deux lignes distinctes
+        slots = [self._slots(portfolio.stocks) for portfolio in portfolios]
+        union = list(dict.fromkeys(slot for portfolio_slots in slots for slot in portfolio_slots))
+        positions = {slot: i for i, slot in enumerate(union)}
+        self.stocks = [stock for stock, _ in union]
+        self._columns = np.array([self.asset.ticker_index[stock] for stock in self.stocks], dtype=np.intp)
+        groups = np.asarray(groups, dtype=np.intp)
+
+        # Lignes des portefeuilles distincts, répliquées sur leurs variantes
+        shape = (len(portfolios), len(self.stocks))
+        quantities = np.zeros(shape)
+        vectors = {
+            name: np.zeros(shape, dtype=np.asarray(getattr(portfolios[0], name)).dtype)
+            for name in self.strategy_class.BATCH_VECTORS
+        }
+        for i, portfolio in enumerate(portfolios):
+            columns = [positions[slot] for slot in slots[i]]
+            quantities[i, columns] = portfolio.quantities
+            for name, vector in vectors.items():
+                vector[i, columns] = getattr(portfolio, name)
+        self.quantities = quantities[groups]
+        for name, vector in vectors.items():
+            setattr(self, name, vector[groups])
+
+        # Paramètres scalaires en vecteurs par variante (défaut de la stratégie si absent)
+        for name in self.strategy_class.BATCH_PARAMETERS:
+            setattr(self, name, np.array([
+                params.get(name, getattr(portfolios[group], name))
+                for params, group in zip(self.variants, groups)
+            ], dtype=np.float64))
+
+        # Grandeurs déduites de l'allocation (poids du cash...), par variante
+        for name in self.strategy_class.BATCH_STATE:
+            values = np.array([getattr(portfolio, name) for portfolio in portfolios], dtype=np.float64)
+            setattr(self, name, values[groups])
+
+        # État du premier jour (voir BacktestEngine._record_portfolio_state)
+        cash = np.array([portfolio.cash for portfolio in portfolios], dtype=np.float64)[groups]
+        portfolio_value = np.array([portfolio.initial_portfolio_value for portfolio in portfolios],
+                                   dtype=np.float64)[groups]
+        total_value = portfolio_value + cash
+        self.cash = cash
+        self._initial_state = {
+            'NAV': self.initial_nav * (total_value / self.initial_cash),
+            'Total_Value': total_value,
+            'Portfolio_Value': portfolio_value,
+            'Cash': cash.copy()
+        }
+
+    def _run_backtest(self, backtest_dates):
+        """Avancement jour par jour de toutes les variantes"""
+        self.dates = pd.DatetimeIndex([self.start_date]).append(backtest_dates)
+        n_variants, n_days = len(self.variants), len(self.dates)
+        self.portfolio = {
+            key: np.zeros((n_variants, n_days))
+            for key in ['NAV', 'Total_Value', 'Portfolio_Value', 'Cash', 'Cash_Injections', 'Dividends']
+        }
+        for key, values in self._initial_state.items():
+            self.portfolio[key][:, 0] = values
+        self.rebalance_days = np.ones(n_variants, dtype=np.int64)  # acquisitions initiales
+        self.traded_value = np.zeros(n_variants)
+
+        rows = self.asset.dates.get_indexer(backtest_dates)
+        for day, (date, row) in enumerate(zip(backtest_dates, rows), start=1):
+            try:
+                self._update_portfolios(day, row)
+            except Exception as e:
+                print(f"Erreur lors du backtest à la date {date}: {str(e)}")
+                raise
+
+    def _update_portfolios(self, day, row):
+        """Mise à jour quotidienne de toutes les variantes"""
+        strategy = self.strategy_class
+
+        # 1. Revalorisation aux prix du jour (vecteur commun ou matrice variantes x titres)
+        prices = self._day_prices(day, row)
+        values = self.quantities * prices
+        portfolio_value = np.nansum(values, axis=1)
+
+        # 2. Collecte des dividendes (un produit matriciel pour toutes les variantes)
+        dividends_collected = np.zeros(len(self.variants))
+        if self.asset.dividend_day_mask[row]:
+            dividends = self.asset.dividend_matrix[row, self._columns]
+            paid = dividends > 0
+            dividends_collected = self.quantities[:, paid] @ dividends[paid]
+        self.cash = self.cash + dividends_collected
+
+        # 3. Valorisation totale et poids courants
+        total_value = portfolio_value + self.cash
+        weights = values / strategy._weight_base(self, portfolio_value, total_value)[:, None]
+
+        # 4. Rééquilibrage des variantes signalées
+        cash_injection = np.zeros(len(self.variants))
+        signal = np.asarray(strategy._rebalancing_signal(self, weights, self.cash, total_value))
+        if signal.any():
+            cash = self.cash
+            base_value, injection, rebalanced_value = strategy._rebalancing_base(self, portfolio_value, total_value)
+            self.cash = np.where(signal, self.cash, cash)
+            cash_injection = np.where(signal, injection, 0.0)
+            portfolio_value = np.where(signal, rebalanced_value, portfolio_value)
+            self._rebalance(signal, np.asarray(base_value, dtype=np.float64), prices)
+
+        # 5. Enregistrement et VL
+        prev_total_value = self.portfolio['Total_Value'][:, day - 1]
+        prev_total_value = np.where(prev_total_value == 0, self.initial_cash, prev_total_value)
+        self.portfolio['NAV'][:, day] = self.portfolio['NAV'][:, day - 1] * (total_value / prev_total_value)
+        self.portfolio['Total_Value'][:, day] = total_value
+        self.portfolio['Portfolio_Value'][:, day] = portfolio_value
+        self.portfolio['Cash'][:, day] = self.cash
+        self.portfolio['Cash_Injections'][:, day] = cash_injection
+        self.portfolio['Dividends'][:, day] = dividends_collected
+
+    def _rebalance(self, signal, base_value, prices):
+        """Ramène aux poids cibles les titres des variantes signalées"""
+        target_values = base_value[:, None] * self.target_weights
+        new_quantities = target_values / prices
+        quantity_diff = new_quantities - self.quantities
+        traded = (np.abs(quantity_diff) > self.MIN_QUANTITY_CHANGE) & signal[:, None]
+
+        self.quantities[traded] = new_quantities[traded]
+        self.rebalance_days += traded.any(axis=1)
+        self.traded_value += np.where(traded, np.abs(quantity_diff * prices), 0.0).sum(axis=1)
+
+    def get_parameters(self):
+        """Paramètres des variantes (une ligne par variante)"""
+        return pd.DataFrame(self.variants, index=pd.RangeIndex(len(self.variants), name='Variante'))
+
+    def get_history(self, key='NAV'):
+        """Historique dates x variantes d'une grandeur (NAV, Total_Value, Cash...)"""
+        return pd.DataFrame(self.portfolio[key].T, index=pd.DatetimeIndex(self.dates, name='Date'),
+                            columns=pd.RangeIndex(len(self.variants), name='Variante'))
+
+    def get_nav_frame(self):
+        """VL de toutes les variantes (dates x variantes)"""
+        return self.get_history('NAV')
+
+    def _benchmark(self):
+        """Niveaux du benchmark aux dates simulées"""
+        return self.asset.get_benchmark_values(self.dates)
+
+    def get_summary(self):
+        """Résultats par variante: métriques de performance (un appel pour toutes
+        les variantes), drawdown, dividendes, injections et rééquilibrages"""
+        nav = self.portfolio['NAV']
+        metrics = performance_metrics(nav, self._benchmark(), sharpe_method=self.strategy_class.SHARPE_METHOD)
+        return pd.DataFrame({
+            **metrics,
+            'Drawdown Max (%)': max_drawdown(nav) * 100,
+            'Total Dividendes': self.portfolio['Dividends'].sum(axis=1),
+            'Total Injections': self.portfolio['Cash_Injections'].sum(axis=1),
+            'Nombre Rebalancements': self.rebalance_days,
+            'Valeur Échangée': self.traded_value
+        }, index=pd.RangeIndex(len(self.variants), name='Variante'))
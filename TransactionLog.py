@@ -0,0 +1,140 @@
+import pandas as pd
+import numpy as np
+
+
+class TransactionLog:
+    """Journal des transactions en colonnes (ajout seul)
+
+    Chaque transaction occupe une ligne de tampons NumPy extensibles: date,
+    code du titre (position dans self.assets), code du type (position dans
+    TYPES), quantité, prix et valorisation. Les transactions étant ajoutées
+    dans l'ordre chronologique, les requêtes par période utilisent searchsorted.
+    """
+
+    TYPES = ('Acquisition', 'Ajustement', 'Cession')
+    COLUMNS = ('Date', 'Asset', 'Type', 'Quantity', 'Price', 'Value')
+
+    def __init__(self, assets, capacity=256):
+        """Initialisation du journal pour une liste ordonnée de titres"""
+        self.assets = list(assets)
+        self._asset_codes = {asset: code for code, asset in enumerate(self.assets)}
+        self._size = 0
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._asset = np.empty(capacity, dtype=np.int32)
+        self._type = np.empty(capacity, dtype=np.int8)
+        self._quantity = np.empty(capacity, dtype=np.float64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._value = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, size):
+        """Agrandit les tampons (capacité doublée) pour contenir `size` lignes"""
+        capacity = len(self._dates)
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity)
+        for name in ('_dates', '_asset', '_type', '_quantity', '_price', '_value'):
+            buffer = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=buffer.dtype)
+            grown[:self._size] = buffer[:self._size]
+            setattr(self, name, grown)
+
+    def append(self, date, asset_codes, transaction_type, quantities, prices, values):
+        """Ajout des transactions d'une date (codes de titres dans l'ordre de self.assets)"""
+        count = len(asset_codes)
+        if count == 0:
+            return
+        start, end = self._size, self._size + count
+        self._grow(end)
+        self._dates[start:end] = np.datetime64(pd.Timestamp(date), 'ns')
+        self._asset[start:end] = asset_codes
+        self._type[start:end] = self.TYPES.index(transaction_type)
+        self._quantity[start:end] = quantities
+        self._price[start:end] = prices
+        self._value[start:end] = values
+        self._size = end
+
+    # Colonnes (vues sur la partie remplie des tampons)
+    @property
+    def dates(self):
+        return self._dates[:self._size]
+
+    @property
+    def asset_codes(self):
+        return self._asset[:self._size]
+
+    @property
+    def type_codes(self):
+        return self._type[:self._size]
+
+    @property
+    def quantities(self):
+        return self._quantity[:self._size]
+
+    @property
+    def prices(self):
+        return self._price[:self._size]
+
+    @property
+    def values(self):
+        return self._value[:self._size]
+
+    def _slice(self, start_date=None, end_date=None):
+        """Bornes des lignes comprises entre deux dates (incluses)"""
+        start = 0 if start_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+        end = self._size if end_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(end_date), 'ns'), side='right')
+        return slice(start, end)
+
+    def _frame(self, rows):
+        """DataFrame des lignes sélectionnées (slice ou masque)"""
+        return pd.DataFrame({
+            'Date': pd.DatetimeIndex(self.dates[rows]),
+            'Asset': np.asarray(self.assets, dtype=object)[self.asset_codes[rows]],
+            'Type': np.asarray(self.TYPES, dtype=object)[self.type_codes[rows]],
+            'Quantity': self.quantities[rows],
+            'Price': self.prices[rows],
+            'Value': self.values[rows]
+        }, columns=list(self.COLUMNS))
+
+    def to_frame(self, start_date=None, end_date=None):
+        """Transactions (format long) sur une période, toutes par défaut"""
+        return self._frame(self._slice(start_date, end_date))
+
+    def on(self, date):
+        """Transactions d'une date (colonnes Asset, Type, Quantity, Price, Value)"""
+        return self.to_frame(date, date).drop(columns='Date')
+
+    def for_asset(self, asset, start_date=None, end_date=None):
+        """Transactions d'un titre sur une période"""
+        rows = self._slice(start_date, end_date)
+        code = self._asset_codes.get(asset, -1)
+        mask = self.asset_codes[rows] == code
+        return self._frame(np.arange(self._size)[rows][mask])
+
+    def trading_dates(self):
+        """Dates distinctes ayant donné lieu à au moins une transaction"""
+        return pd.DatetimeIndex(np.unique(self.dates))
+
+    def rebalance_count(self):
+        """Nombre de jours avec transactions (acquisitions initiales comprises)"""
+        if self._size == 0:
+            return 0
+        return int(1 + np.count_nonzero(np.diff(self.dates) != np.timedelta64(0, 'ns')))
+
+    def traded_value(self, by='Date', start_date=None, end_date=None, include_acquisitions=False):
+        """Valorisation échangée agrégée par date ou par titre ('Date' ou 'Asset')"""
+        rows = np.arange(self._size)[self._slice(start_date, end_date)]
+        if not include_acquisitions:
+            rows = rows[self.type_codes[rows] != self.TYPES.index('Acquisition')]
+        values = self.values[rows]
+
+        if by == 'Asset':
+            totals = np.bincount(self.asset_codes[rows], weights=values, minlength=len(self.assets))
+            return pd.Series(totals, index=self.assets, name='Value')
+        dates, positions = np.unique(self.dates[rows], return_inverse=True)
+        totals = np.bincount(positions, weights=values, minlength=len(dates))
+        return pd.Series(totals, index=pd.DatetimeIndex(dates, name='Date'), name='Value')
@@ -1,44 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from Asset2 import Asset2
+from Asset2 import Asset2, file_digest
 from Strategy2 import Strategy2
 from Strategy3 import Strategy3
 from Strategy4 import Strategy4
+from sectors import SECTORS, SECTOR_METRICS, sector_weights, sector_weight_history, breach_timeline
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime
 import base64
-import io
+from collections import OrderedDict
+import os
 import plotly.express as px
-import xlsxwriter
-
-
-
-
-
-SECTORS = {
-    'SERVICES PUBLICS': ['SNTS', 'ORAC', 'SDCC', 'ONTBF', 'CIEC'],
-    'FINANCES': ['BOAB', 'BOABF', 'BOAC', 'BOAM', 'BOAN', 'BOAS', 'CBIBF', 'ECOC', 'ETIT', 
-                'NSBC', 'ORGT', 'SAFC', 'SGBC', 'SIBC', 'BICB'],
-    'INDUSTRIE': ['SIVC', 'SEMC', 'FTSC', 'NEIC', 'NTLC', 'CABC', 'STBC', 'SMBC', 'SLBC', 
-                 'UNLC', 'UNXC'],
-    'DISTRIBUTIONS': ['BNBC', 'CFAC', 'ABJC', 'TTLC', 'TTLS', 'PRSC', 'SHEC'],
-    'AGRICULTURE': ['PALC', 'SPHC', 'SICC', 'SOGC', 'SCRC'],
-    'AUTRES SECTEURS': ['STAC', 'LNBB'],
-    'TRANSPORT': ['SDSC', 'SVOC']
-}
-
-SECTOR_METRICS = {
-    'SERVICES PUBLICS': {'market_weight': 0.464, 'target': 0.50, 'deviation': 0.20},
-    'FINANCES': {'market_weight': 0.363, 'target': 0.30, 'deviation': 0.15},
-    'INDUSTRIE': {'market_weight': 0.078, 'target': 0.10, 'deviation': 0.05},
-    'DISTRIBUTIONS': {'market_weight': 0.045, 'target': 0.025, 'deviation': 0.05},
-    'AGRICULTURE': {'market_weight': 0.035, 'target': 0.025, 'deviation': 0.05},
-    'AUTRES SECTEURS': {'market_weight': 0.009, 'target': 0.025, 'deviation': 0.05},
-    'TRANSPORT': {'market_weight': 0.007, 'target': 0.025, 'deviation': 0.05}
-}
-
+from export import EXCEL_MAX_ROWS, export_excel, states_table
 
 
 
@@ -131,6 +106,24 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Caches de session bornés (les entrées les moins récemment utilisées sont évincées)
+ASSET_CACHE_SIZE = 2
+RESULT_CACHE_SIZE = 8
+
+
+def cached(name, key, max_entries, build):
+    """Valeur du cache de session `name` pour `key`, calculée par build() si absente"""
+    cache = st.session_state.setdefault(name, OrderedDict())
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = build()
+    cache[key] = value
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+    return value
+
+
 # Fonction pour charger le logo
 def load_logo():
     with open("img/logo_soaga.png", "rb") as f:
@@ -138,21 +131,6 @@ def load_logo():
     return f"data:image/png;base64,{data}"
 
 
-def calculate_sector_weights(portfolio_state):
-    """Calcule les poids sectoriels du portefeuille"""
-    sector_weights = {}
-    
-    for sector, stocks in SECTORS.items():
-        sector_weight = sum(
-            portfolio_state.loc[stock, 'Weight'] 
-            for stock in stocks 
-            if stock in portfolio_state.index
-        )
-        sector_weights[sector] = sector_weight
-        
-    return sector_weights
-
-
 # Sidebar
 with st.sidebar:
     try:
@@ -208,9 +186,23 @@ with st.sidebar:
         
         submit_button = st.form_submit_button("Backtester")
 
+# Paramètres du dernier backtest soumis, conservés en session: les résultats
+# restent affichés lors des réexécutions hors formulaire (fenêtre glissante...)
+if submit_button:
+    st.session_state['backtest_config'] = {
+        'strategy_type': strategy_type,
+        'uploaded_prices': uploaded_prices,
+        'uploaded_dividends': uploaded_dividends,
+        'initial_nav': initial_nav,
+        'initial_cash': initial_cash,
+        'start_date': start_date,
+        'end_date': end_date
+    }
+backtest_config = st.session_state.get('backtest_config')
+
 # Zone principale
-# Dans la section if not submit_button:
-if not submit_button:
+# Dans la section sans backtest soumis:
+if backtest_config is None:
     # Description de l'outil
     st.markdown("""
         <style>
@@ -326,29 +318,50 @@ if not submit_button:
     st.markdown("</div>", unsafe_allow_html=True)
 
 else:
+    # Paramètres du backtest soumis
+    strategy_type = backtest_config['strategy_type']
+    uploaded_prices = backtest_config['uploaded_prices']
+    uploaded_dividends = backtest_config['uploaded_dividends']
+    initial_nav = backtest_config['initial_nav']
+    initial_cash = backtest_config['initial_cash']
+    start_date = backtest_config['start_date']
+    end_date = backtest_config['end_date']
+    
     try:
-        # Chargement des données
-        asset = Asset2(uploaded_prices, uploaded_dividends)
+        # Chargement des données (en cache selon le contenu des fichiers)
+        data_key = (file_digest(uploaded_prices), file_digest(uploaded_dividends))
+        asset = cached(
+            'asset_cache', data_key, ASSET_CACHE_SIZE,
+            lambda: Asset2(uploaded_prices, uploaded_dividends)
+        )
         
         # Création de la stratégie selon le choix
         if strategy_type == "High return & Low Vol.":
-            strategy = Strategy2(
-                initial_cash=initial_cash,
-                initial_nav=initial_nav,
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d'),
-                asset=asset
-            )
-            strategy_name = "High-Return-&-Low-Vol"
+            strategy_class, strategy_name = Strategy2, "High-Return-&-Low-Vol"
         else:
-            strategy = Strategy3(
+            strategy_class, strategy_name = Strategy3, "StratégieT125"
+        
+        def run_strategy():
+            """Simulation jour par jour avec barre de progression"""
+            strategy = strategy_class(
                 initial_cash=initial_cash,
                 initial_nav=initial_nav,
                 start_date=start_date.strftime('%Y-%m-%d'),
                 end_date=end_date.strftime('%Y-%m-%d'),
-                asset=asset
+                asset=asset,
+                run=False
             )
-            strategy_name = "StratégieT125"
+            n_days = len(strategy._backtest_dates())
+            progress = st.progress(0.0, text="Backtest en cours...")
+            for day, snapshot in enumerate(strategy.iter_days(), start=1):
+                if day % 20 == 0 or day == n_days:
+                    progress.progress(day / n_days, text=f"Backtest en cours... {snapshot['Date'].strftime('%d/%m/%Y')}")
+            progress.empty()
+            return strategy
+        
+        # Résultats en cache: (stratégie, dates, cash, VL, empreinte des données)
+        result_key = (strategy_name, start_date, end_date, initial_cash, initial_nav, data_key)
+        strategy = cached('result_cache', result_key, RESULT_CACHE_SIZE, run_strategy)
         
         
         
@@ -387,10 +400,12 @@ else:
         
         
         
-        history = strategy.get_portfolio_history()
+        # États initial et final (seuls ces deux états sont construits)
+        history_dates = strategy.portfolio['Date']
+        summary = strategy.get_portfolio_history(dates=[history_dates[0], history_dates[-1]])
         
         # Affichage des états initial et final
-        for day, title in [(history.iloc[0], "État Initial"), (history.iloc[-1], "État Final")]:
+        for day, title in [(summary.iloc[0], "État Initial"), (summary.iloc[-1], "État Final")]:
             st.markdown(f"""
                 <div class='section-container'>
                     <h3 style='color: maroon; text-align: center;'>{title}</h3>
@@ -438,7 +453,7 @@ else:
         
         # État initial
         with weight_col1:
-            initial_state = history.iloc[0]['State']
+            initial_state = summary.iloc[0]['State']
             fig_initial = px.bar(
                 initial_state,
                 x=initial_state.index,
@@ -465,7 +480,7 @@ else:
         
         # État final
         with weight_col2:
-            final_state = history.iloc[-1]['State']
+            final_state = summary.iloc[-1]['State']
             fig_final = px.bar(
                 final_state,
                 x=final_state.index,
@@ -501,7 +516,7 @@ else:
          """, unsafe_allow_html=True)
 
         # Calcul des poids sectoriels
-        current_sector_weights = calculate_sector_weights(final_state)
+        current_sector_weights = sector_weights(final_state['Weight'])
 
         # Création du tableau
         sector_data = {
@@ -585,6 +600,43 @@ else:
         # Affichage du graphique
         st.plotly_chart(fig_sectors, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
+
+        # Historique des expositions sectorielles et dépassements des bandes
+        st.markdown("""
+            <div class='section-container'>
+            <h3 style='color: maroon; text-align: center;'>Expositions Sectorielles</h3>
+         """, unsafe_allow_html=True)
+
+        sector_history = sector_weight_history(strategy)
+        fig_exposure = go.Figure()
+        for sector in SECTORS:
+            fig_exposure.add_trace(go.Scatter(
+                x=sector_history.index,
+                y=sector_history[sector] * 100,
+                name=sector,
+                stackgroup='secteurs'
+            ))
+        fig_exposure.update_layout(
+            template='plotly_white',
+            height=450,
+            yaxis_title='Poids (%)',
+            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+        )
+        st.plotly_chart(fig_exposure, use_container_width=True)
+
+        breaches = breach_timeline(sector_history)
+        if breaches.empty:
+            st.success("Aucun dépassement des bandes sectorielles (cible ± déviation) sur la période")
+        else:
+            st.markdown("**Dépassements des bandes sectorielles (cible ± déviation):**")
+            st.dataframe(
+                breaches.style.format({
+                    'Début': '{:%d/%m/%Y}',
+                    'Fin': '{:%d/%m/%Y}',
+                    'Poids Extrême (%)': '{:.2f}%'
+                })
+            )
+        st.markdown("</div>", unsafe_allow_html=True)
         
         # Graphique de performance
         st.markdown("""
@@ -735,8 +787,45 @@ else:
             ), unsafe_allow_html=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
-        
-        
+
+        # Analyse glissante du risque
+        st.markdown("""
+            <div class='section-container'>
+                <h3 style='color: maroon; text-align: center;'>Analyse Glissante du Risque</h3>
+        """, unsafe_allow_html=True)
+
+        rolling_windows = {'1 mois': 21, '3 mois': 63, '6 mois': 126, '1 an': 252}
+        available_windows = {
+            label: window for label, window in rolling_windows.items()
+            if window < len(strategy.portfolio['Date'])
+        }
+        if available_windows:
+            window_label = st.selectbox("Fenêtre glissante", list(available_windows), index=min(1, len(available_windows) - 1))
+            rolling = strategy.get_rolling_metrics(available_windows[window_label])
+
+            fig_rolling = make_subplots(
+                rows=2, cols=2,
+                subplot_titles=('Volatilité (%)', 'Ratio de Sharpe', 'Beta et Tracking Error (%)', 'Drawdown (%)')
+            )
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Volatilité (%)'],
+                                             name='Volatilité', line=dict(color='maroon', width=2)), row=1, col=1)
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Ratio de Sharpe'],
+                                             name='Sharpe', line=dict(color='maroon', width=2)), row=1, col=2)
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Beta'],
+                                             name='Beta', line=dict(color='black', width=2)), row=2, col=1)
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Tracking Error (%)'],
+                                             name='Tracking Error', line=dict(color='maroon', width=2)), row=2, col=1)
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Drawdown (%)'],
+                                             name='Drawdown', line=dict(color='maroon', width=2), fill='tozeroy'), row=2, col=2)
+            fig_rolling.add_trace(go.Scatter(x=rolling.index, y=rolling['Drawdown Max (%)'],
+                                             name='Drawdown Max', line=dict(color='black', width=2, dash='dash')), row=2, col=2)
+            fig_rolling.update_layout(template='plotly_white', height=700, showlegend=True)
+            st.plotly_chart(fig_rolling, use_container_width=True)
+        else:
+            st.info("Période trop courte pour l'analyse glissante")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+
         # # Graphique d'évolution du cash
         # st.markdown("""
         #     <div class='section-container'>
@@ -781,51 +870,35 @@ else:
             </div>
         """, unsafe_allow_html=True)
         
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Export des états
-            all_states = []
-            for _, row in history.iterrows():
-                state_df = row['State'].copy()
-                state_df['Date'] = row['Date']
-                state_df['NAV'] = row['NAV']
-                state_df['Total_Value'] = row['Total_Value']
-                all_states.append(state_df)
-            
-            states_df = pd.concat(all_states)
-            states_df.to_excel(writer, sheet_name='États', index=True)
-            
-            # Export des transactions
-            all_transactions = []
-            for _, row in history.iterrows():
-                if isinstance(row['Transactions'], pd.DataFrame) and not row['Transactions'].empty:
-                    trans_df = row['Transactions'].copy()
-                    trans_df['Date'] = row['Date']
-                    all_transactions.append(trans_df)
+        # Classeur écrit en mémoire constante dans un fichier temporaire
+        file_name = f"resultat_{strategy_name.lower()}_{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}"
+        n_rows = len(strategy.portfolio['Date']) * len(strategy.stocks)
+        if n_rows + 1 <= EXCEL_MAX_ROWS:
+            def build_export():
+                """Classeur Excel (octets) des résultats"""
+                export_path = export_excel(strategy, metrics)
+                try:
+                    with open(export_path, 'rb') as f:
+                        return f.read()
+                finally:
+                    os.remove(export_path)
             
-            if all_transactions:
-                transactions_df = pd.concat(all_transactions)
-                transactions_df.to_excel(writer, sheet_name='Transactions', index=False)
-            
-            # Export des métriques
-            metrics_df = pd.DataFrame({
-                   'Métrique': list(metrics.keys()),
-                   'Valeur': list(metrics.values())
-            })
-
-            # Export metrics in column format
-            metrics_df.to_excel(
-                 writer, 
-                 sheet_name='Métriques',
-                 index=False
+            # Seul le classeur du résultat affiché est conservé
+            export_data = cached('export_cache', result_key, 1, build_export)
+            st.download_button(
+                label="📥 Télécharger les données",
+                data=export_data,
+                file_name=f"{file_name}.xlsx",
+                mime="application/vnd.ms-excel"
+            )
+        else:
+            # Historique trop long pour une feuille Excel: états au format CSV
+            st.download_button(
+                label="📥 Télécharger les états (CSV)",
+                data=states_table(strategy).to_csv(index=False).encode('utf-8'),
+                file_name=f"{file_name}_etats.csv",
+                mime="text/csv"
             )
-        
-        st.download_button(
-            label="📥 Télécharger les données",
-            data=output.getvalue(),
-            file_name=f"resultat_{strategy_name.lower()}_{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}.xlsx",
-            mime="application/vnd.ms-excel"
-        )
         
     except Exception as e:
         st.error(f"Une erreur s'est produite: {str(e)}")
\ No newline at end of file
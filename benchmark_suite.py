@@ -0,0 +1,265 @@
+"""Mesures de performance reproductibles sur données synthétiques
+
+Un générateur produit des classeurs de cours et de dividendes de type BRVM
+(au format lu par Asset2) de taille paramétrable: nombre de titres, nombre
+d'années de cotation et fréquence des dividendes. Les étapes chronométrées
+sont le chargement d'Asset2 (classeur puis cache des prix), la sélection
+get_top_dividend_stocks, un backtest complet de Strategy2/3/4, le calcul des
+métriques et l'export Excel. Chaque étape est répétée et ses durées minimale
+et médiane sont enregistrées en JSON avec la configuration et les versions,
+pour comparaison avec une exécution antérieure (compare_results).
+
+Exemple:
+    python benchmark_suite.py --tickers 60 --years 6 --frequency 2 --output mesures.json
+    python benchmark_suite.py --compare mesures_precedentes.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Asset2 import Asset2
+from export import export_excel
+from metrics import performance_metrics, rolling_metrics
+from sectors import SECTORS
+from sweep import STRATEGIES
+
+# Titres de la BRVM cités par les stratégies (poids fixes et groupes de Strategy3)
+BRVM_TICKERS = list(dict.fromkeys(
+    [stock for members in SECTORS.values() for stock in members] + ['BICC']
+))
+# Écart relatif de durée au-delà duquel une étape est signalée en régression
+REGRESSION_THRESHOLD = 0.20
+
+
+def generate_prices(n_tickers=len(BRVM_TICKERS), years=5, start='2020-01-01',
+                    missing_rate=0.001, seed=0):
+    """Cours quotidiens synthétiques (jours ouvrés): modèle à un facteur de
+    marché, volatilités propres aux titres et quelques cours manquants
+
+    Les titres de BRVM_TICKERS viennent en premier, complétés par des codes
+    SYN001, SYN002... Renvoie un DataFrame (colonne Date, titres, BRVM C)."""
+    if n_tickers < len(BRVM_TICKERS):
+        raise ValueError(f"Au moins {len(BRVM_TICKERS)} titres sont nécessaires aux stratégies")
+    rng = np.random.default_rng(seed)
+    tickers = BRVM_TICKERS + [f'SYN{i:03d}' for i in range(1, n_tickers - len(BRVM_TICKERS) + 1)]
+    start = pd.Timestamp(start)
+    dates = pd.bdate_range(start, start + pd.DateOffset(years=years) - pd.Timedelta(days=1))
+
+    # Rendements: facteur de marché commun et composante propre
+    market = rng.normal(0.0002, 0.007, len(dates))
+    betas = rng.uniform(0.3, 1.2, n_tickers)
+    volatilities = rng.uniform(0.008, 0.025, n_tickers)
+    returns = market[:, None] * betas + rng.normal(0.0002, 1.0, (len(dates), n_tickers)) * volatilities
+    levels = rng.uniform(500, 20000, n_tickers)
+    prices = np.round(levels * np.exp(np.cumsum(returns, axis=0)), 2)
+    prices[rng.random(prices.shape) < missing_rate] = np.nan
+
+    data = pd.DataFrame(prices, columns=tickers)
+    data.insert(0, 'Date', dates)
+    data.insert(len(BRVM_TICKERS) // 2, 'BRVM C', np.round(200 * np.exp(np.cumsum(market)), 2))
+    return data
+
+
+def generate_dividends(prices, frequency=1, payer_ratio=0.85, seed=0):
+    """Dividendes synthétiques: une feuille par année (Date, ISIN, Montant, Div Yield)
+
+    frequency: versements par an et par titre payeur (1 annuel, 2 semestriel...)
+    payer_ratio: part des titres versant un dividende
+    Le rendement annuel de chaque payeur suit une tendance haussière bruitée;
+    chaque versement vaut cours du jour x rendement / frequency.
+    Renvoie un dictionnaire nom de feuille -> DataFrame."""
+    rng = np.random.default_rng(seed + 1)
+    data = prices.set_index('Date').drop(columns='BRVM C')
+    dates = data.index
+    payers = data.columns[rng.random(len(data.columns)) < payer_ratio]
+    base_yields = pd.Series(rng.uniform(0.03, 0.09, len(payers)), index=payers)
+
+    sheets = {}
+    for k, year in enumerate(sorted(set(dates.year))):
+        year_dates = dates[dates.year == year]
+        rows = []
+        for stock in payers:
+            div_yield = round(base_yields[stock] + 0.004 * k + rng.normal(0, 0.002), 4)
+            # Versements répartis dans l'année (premier dans la première période)
+            period = len(year_dates) // frequency
+            for p in range(frequency):
+                day = year_dates[p * period + rng.integers(0, period)]
+                price = data.at[day, stock]
+                if np.isnan(price):
+                    continue
+                rows.append({'Date': day, 'ISIN': stock,
+                             'Montant': round(price * div_yield / frequency, 2),
+                             'Div Yield': div_yield})
+        sheets[str(year)] = pd.DataFrame(rows, columns=['Date', 'ISIN', 'Montant', 'Div Yield'])
+    return sheets
+
+
+def write_workbooks(directory, n_tickers=len(BRVM_TICKERS), years=5, frequency=1,
+                    start='2020-01-01', seed=0):
+    """Écriture des classeurs synthétiques de cours et de dividendes
+
+    Renvoie les chemins (cours, dividendes)."""
+    os.makedirs(directory, exist_ok=True)
+    prices = generate_prices(n_tickers, years, start, seed=seed)
+    price_file = os.path.join(directory, 'cours.xlsx')
+    dividend_file = os.path.join(directory, 'dividendes.xlsx')
+    prices.to_excel(price_file, index=False, engine='xlsxwriter')
+    with pd.ExcelWriter(dividend_file, engine='xlsxwriter') as writer:
+        for sheet_name, sheet in generate_dividends(prices, frequency, seed=seed).items():
+            sheet.to_excel(writer, sheet_name=sheet_name, index=False)
+    return price_file, dividend_file
+
+
+def timed(function, repeat=3, setup=None):
+    """Durées (secondes) de `repeat` appels de function(setup())
+    (la préparation n'est pas chronométrée)"""
+    durations = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        begin = time.perf_counter()
+        function(argument) if setup is not None else function()
+        durations.append(time.perf_counter() - begin)
+    return {'min_s': min(durations), 'median_s': statistics.median(durations), 'repeat': repeat}
+
+
+def run_benchmarks(price_file, dividend_file, start_date, end_date, repeat=3,
+                   strategies=tuple(STRATEGIES), initial_cash=90000000.0, initial_nav=100.0):
+    """Chronométrage des étapes sur une période de backtest
+
+    Chaque étape part de données fraîchement chargées depuis le cache des prix
+    (sans mémoïsation héritée d'une répétition précédente).
+    Renvoie un dictionnaire étape -> {min_s, median_s, repeat}."""
+    timings = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def fresh_asset():
+            return Asset2(price_file, dividend_file, cache_dir=cache_dir)
+
+        # Chargement: classeurs Excel puis cache colonnaire des prix
+        timings['asset_load_excel'] = timed(lambda: Asset2(price_file, dividend_file, cache_dir=None), repeat)
+        fresh_asset()
+        timings['asset_load_cached'] = timed(fresh_asset, repeat)
+
+        # Sélection des titres à chaque début de mois de la période
+        asset = fresh_asset()
+        months = [asset.next_available_date(date)
+                  for date in pd.date_range(start_date, end_date, freq='MS')]
+        months = [date for date in months if date is not None]
+        timings['get_top_dividend_stocks'] = timed(
+            lambda asset: [asset.get_top_dividend_stocks(date) for date in months], repeat, fresh_asset
+        )
+
+        # Backtests complets
+        results = {}
+        for name in strategies:
+            def run(asset, name=name):
+                results[name] = STRATEGIES[name](initial_cash, initial_nav, start_date, end_date, asset)
+            timings[f'{name}_run'] = timed(run, repeat, fresh_asset)
+
+        # Métriques et export sur le dernier backtest
+        strategy = results[strategies[-1]]
+        nav = np.asarray(strategy.portfolio['NAV'], dtype=np.float64)
+        benchmark = strategy.asset.get_benchmark_values(strategy.portfolio['Date'])
+        timings['performance_metrics'] = timed(strategy.get_performance_metrics, repeat)
+        timings['rolling_metrics'] = timed(lambda: rolling_metrics(nav, benchmark), repeat)
+        timings['performance_metrics_batch_100'] = timed(
+            lambda: performance_metrics(np.tile(nav, (100, 1)), benchmark), repeat
+        )
+        metrics = strategy.get_performance_metrics()
+        timings['excel_export'] = timed(lambda: os.remove(export_excel(strategy, metrics)), repeat)
+    return timings
+
+
+def environment():
+    """Versions et plate-forme de l'exécution"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_results(current, previous, threshold=REGRESSION_THRESHOLD):
+    """Comparaison des durées médianes avec une exécution antérieure
+
+    Renvoie un DataFrame (étape x durées, rapport, régression)."""
+    rows = []
+    for step, timing in current['timings'].items():
+        if step not in previous.get('timings', {}):
+            continue
+        before = previous['timings'][step]['median_s']
+        ratio = timing['median_s'] / before if before else np.nan
+        rows.append({'Étape': step, 'Avant (s)': before, 'Après (s)': timing['median_s'],
+                     'Rapport': ratio, 'Régression': bool(ratio > 1 + threshold)})
+    return pd.DataFrame(rows, columns=['Étape', 'Avant (s)', 'Après (s)', 'Rapport', 'Régression'])
+
+
+def parse_args(argv=None):
+    """Arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Mesures de performance sur données synthétiques")
+    parser.add_argument('--tickers', type=int, default=len(BRVM_TICKERS), help="Nombre de titres")
+    parser.add_argument('--years', type=int, default=5, help="Années de cotation")
+    parser.add_argument('--frequency', type=int, default=1, help="Versements de dividendes par an")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du générateur")
+    parser.add_argument('--repeat', type=int, default=3, help="Répétitions par étape")
+    parser.add_argument('--start', help="Début du backtest (défaut: début de la 3e année)")
+    parser.add_argument('--end', help="Fin du backtest (défaut: dernier jour des données)")
+    parser.add_argument('--strategy', nargs='+', choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--data-dir', help="Répertoire des classeurs générés (défaut: temporaire)")
+    parser.add_argument('--output', default='benchmark_results.json', help="Fichier JSON des résultats")
+    parser.add_argument('--compare', help="Résultats JSON antérieurs à comparer")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Écart relatif signalé en régression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Point d'entrée: génération des données, mesures, écriture et comparaison"""
+    args = parse_args(argv)
+    first_date = pd.Timestamp('2020-01-01')
+    start_date = args.start or str((first_date + pd.DateOffset(years=2)).date())
+    end_date = args.end or str((first_date + pd.DateOffset(years=args.years) - pd.Timedelta(days=1)).date())
+    config = {'tickers': args.tickers, 'years': args.years, 'frequency': args.frequency,
+              'seed': args.seed, 'repeat': args.repeat, 'start': start_date, 'end': end_date,
+              'strategies': args.strategy}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        price_file, dividend_file = write_workbooks(
+            args.data_dir or tmp_dir, args.tickers, args.years, args.frequency,
+            str(first_date.date()), args.seed
+        )
+        timings = run_benchmarks(price_file, dividend_file, start_date, end_date,
+                                 args.repeat, tuple(args.strategy))
+
+    results = {'date': pd.Timestamp.now().isoformat(timespec='seconds'),
+               'config': config, 'environment': environment(), 'timings': timings}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    for step, timing in timings.items():
+        print(f"{step:<32} min {timing['min_s']:8.4f} s   médiane {timing['median_s']:8.4f} s")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('config') != config:
+            print("Attention: configuration différente de l'exécution comparée", file=sys.stderr)
+        comparison = compare_results(results, previous, args.threshold)
+        print(comparison.to_string(index=False))
+        if comparison['Régression'].any():
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Exécution des stratégies en ligne de commande (sans interface)
+
+Charge les cours et les dividendes, exécute une ou plusieurs stratégies sur des
+périodes données et écrit pour chaque exécution la VL et les flux
+(portefeuille), les positions (etats), les transactions et les métriques en
+Parquet, CSV ou JSON, ainsi qu'une table récapitulative des métriques
+(resume). N'importe ni streamlit ni plotly.
+
+Les exécutions sont indépendantes et réparties sur un pool de processus qui
+chargent chacun une seule fois les données (voir sweep.worker_pool).
+
+Exemples:
+    python cli.py --prices cours.xlsx --dividends Dividendes.xlsx \\
+        --strategy Strategy2 Strategy4 --period 2024-01-01:2025-04-30 --format csv
+
+    python cli.py --job travaux.json
+
+Fichier de travaux (JSON): paramètres communs et liste des exécutions
+    {
+        "prices": "cours.xlsx", "dividends": "Dividendes.xlsx",
+        "output": "resultats", "format": "csv", "workers": 4,
+        "initial_cash": 90000000.0, "initial_nav": 100.0,
+        "jobs": [
+            {"strategy": "Strategy2", "start": "2024-01-01", "end": "2025-04-30",
+             "params": {"drift_tolerance": 0.03}},
+            {"name": "s4_frais", "strategy": "Strategy4", "start": "2024-01-01",
+             "end": "2025-04-30", "costs": {"impact_rate": 0.01}}
+        ]
+    }
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+from Asset2 import Asset2, CACHE_DIR
+from costs import CostModel
+from export import EXPORT_FORMATS, check_format, export_tables, write_table
+from sweep import STRATEGIES, worker_asset, worker_pool
+
+INITIAL_CASH = 90000000.0
+INITIAL_NAV = 100.0
+
+
+def job_name(job):
+    """Nom d'une exécution (répertoire de sortie)"""
+    return job.get('name') or f"{job['strategy']}_{job['start']}_{job['end']}"
+
+
+def load_jobs(path):
+    """Lecture d'un fichier de travaux JSON: (paramètres communs, exécutions)"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    jobs = config.pop('jobs', [])
+    if not jobs:
+        raise ValueError(f"Aucune exécution dans le fichier de travaux: {path}")
+    return config, jobs
+
+
+def validate_jobs(jobs):
+    """Vérification des stratégies, des dates et de l'unicité des noms"""
+    names = set()
+    for job in jobs:
+        for key in ('strategy', 'start', 'end'):
+            if key not in job:
+                raise KeyError(f"Paramètre manquant '{key}' dans l'exécution {job}")
+        if job['strategy'] not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue: {job['strategy']}")
+        if pd.to_datetime(job['start']) >= pd.to_datetime(job['end']):
+            raise ValueError(f"Période invalide pour {job_name(job)}: {job['start']} - {job['end']}")
+        name = job_name(job)
+        if name in names:
+            raise ValueError(f"Nom d'exécution en double: {name}")
+        names.add(name)
+
+
+def run_job(job, output, fmt, initial_cash, initial_nav, asset=None):
+    """Exécute un backtest et écrit ses tables dans output/<nom>
+
+    Une exécution en échec (ex: titres insuffisants) est signalée dans la
+    colonne 'Erreur' du récapitulatif sans interrompre les autres."""
+    asset = asset if asset is not None else worker_asset()
+    name = job_name(job)
+    row = {'Exécution': name, 'Stratégie': job['strategy'], 'Début': job['start'], 'Fin': job['end']}
+    try:
+        params = dict(job.get('params') or {})
+        if job.get('costs') is not None:
+            params['cost_model'] = CostModel(**job['costs'])
+        strategy = STRATEGIES[job['strategy']](
+            job.get('initial_cash', initial_cash), job.get('initial_nav', initial_nav),
+            job['start'], job['end'], asset, **params
+        )
+        metrics = strategy.get_performance_metrics()
+        export_tables(strategy, os.path.join(output, name), fmt, metrics)
+        row.update(metrics)
+        row['Erreur'] = None
+    except Exception as e:
+        row['Erreur'] = str(e)
+    return row
+
+
+def _run_task(task):
+    """Point d'entrée d'une exécution dans le pool"""
+    return run_job(*task)
+
+
+def run_jobs(jobs, price_file, dividend_file, output, fmt='csv',
+             initial_cash=INITIAL_CASH, initial_nav=INITIAL_NAV, max_workers=None,
+             cache_dir=CACHE_DIR):
+    """Exécution d'une liste de backtests et écriture du récapitulatif
+
+    jobs: liste de dicts {strategy, start, end, [name], [params], [costs],
+          [initial_cash], [initial_nav]} (params: paramètres du constructeur,
+          costs: paramètres de CostModel)
+    max_workers: nombre de processus (1 pour une exécution dans le processus courant)
+
+    Renvoie le récapitulatif (une ligne par exécution)."""
+    check_format(fmt)
+    validate_jobs(jobs)
+    tasks = [(job, output, fmt, initial_cash, initial_nav) for job in jobs]
+
+    if max_workers == 1 or len(tasks) == 1:
+        asset = Asset2(price_file, dividend_file, cache_dir=cache_dir)
+        rows = [run_job(*task, asset=asset) for task in tasks]
+    else:
+        with worker_pool(price_file, dividend_file, max_workers, cache_dir) as pool:
+            rows = list(pool.map(_run_task, tasks))
+
+    summary = pd.DataFrame(rows)
+    os.makedirs(output, exist_ok=True)
+    write_table(summary, os.path.join(output, f'resume.{fmt}'), fmt)
+    return summary
+
+
+def parse_period(period):
+    """Période 'début:fin' (dates AAAA-MM-JJ)"""
+    start, separator, end = period.partition(':')
+    if not separator or not start or not end:
+        raise argparse.ArgumentTypeError(f"Période invalide (attendu début:fin): {period}")
+    return start, end
+
+
+def parse_args(argv=None):
+    """Arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Backtests des stratégies sans interface")
+    parser.add_argument('--job', help="Fichier de travaux JSON (paramètres communs et exécutions)")
+    parser.add_argument('--prices', help="Classeur des cours historiques")
+    parser.add_argument('--dividends', help="Classeur des dividendes")
+    parser.add_argument('--strategy', nargs='+', choices=sorted(STRATEGIES), help="Stratégies à exécuter")
+    parser.add_argument('--period', nargs='+', type=parse_period, help="Périodes début:fin")
+    parser.add_argument('--params', type=json.loads, help="Paramètres des stratégies (JSON)")
+    parser.add_argument('--output', help="Répertoire de sortie (défaut: resultats)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="Format des tables (défaut: csv)")
+    parser.add_argument('--initial-cash', type=float, help=f"Cash initial (défaut: {INITIAL_CASH:,.0f})")
+    parser.add_argument('--initial-nav', type=float, help=f"VL initiale (défaut: {INITIAL_NAV:g})")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (1: processus courant)")
+    parser.add_argument('--cache-dir', help="Répertoire du cache des cours")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Point d'entrée: les options de la ligne de commande priment sur le fichier de travaux"""
+    args = parse_args(argv)
+    config, jobs = load_jobs(args.job) if args.job else ({}, [])
+    if args.strategy or args.period:
+        if not (args.strategy and args.period):
+            raise SystemExit("--strategy et --period doivent être donnés ensemble")
+        jobs = [
+            {'strategy': strategy, 'start': start, 'end': end, 'params': args.params or {}}
+            for strategy in args.strategy for start, end in args.period
+        ]
+    if not jobs:
+        raise SystemExit("Aucune exécution: utiliser --job ou --strategy et --period")
+
+    prices = args.prices or config.get('prices')
+    dividends = args.dividends or config.get('dividends')
+    if not prices or not dividends:
+        raise SystemExit("Classeurs des cours et des dividendes requis (--prices, --dividends)")
+
+    # Format (et dépendance Parquet) et exécutions vérifiés avant tout calcul
+    fmt = args.format or config.get('format', 'csv')
+    try:
+        check_format(fmt)
+        validate_jobs(jobs)
+    except (ValueError, KeyError, ImportError) as e:
+        raise SystemExit(e.args[0])
+
+    summary = run_jobs(
+        jobs, prices, dividends,
+        output=args.output or config.get('output', 'resultats'),
+        fmt=fmt,
+        initial_cash=args.initial_cash or config.get('initial_cash', INITIAL_CASH),
+        initial_nav=args.initial_nav or config.get('initial_nav', INITIAL_NAV),
+        max_workers=args.workers or config.get('workers'),
+        cache_dir=args.cache_dir or config.get('cache_dir', CACHE_DIR)
+    )
+    failed = summary['Erreur'].notna()
+    print(summary.drop(columns='Erreur').to_string(index=False))
+    for _, row in summary[failed].iterrows():
+        print(f"Échec {row['Exécution']}: {row['Erreur']}", file=sys.stderr)
+    return 1 if failed.any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Frais de transaction et glissement de prix
+
+Un barème (CostModel) combine des frais proportionnels au montant échangé
+(courtage de la SGI, frais BRVM et dépositaire) et un impact de marché dont le
+taux croît avec le montant de l'ordre. Deux usages:
+
+- a posteriori: apply_costs réévalue la VL d'un backtest déjà simulé à partir
+  du journal des transactions, pour plusieurs barèmes en une passe vectorisée
+  (sans nouvelle simulation);
+- dans la boucle: BacktestEngine(..., cost_model=CostModel(...)) prélève les
+  frais lors de chaque transaction, ce qui réduit les quantités achetées.
+
+Exemple:
+    schedules = [CostModel(name='Sans frais', brokerage_rate=0, exchange_rate=0),
+                 CostModel(name='Standard'),
+                 CostModel(name='Impact', impact_rate=0.002)]
+    nav = apply_costs(strategy, schedules)
+"""
+import numpy as np
+import pandas as pd
+
+# Taux indicatifs (à ajuster selon les conditions négociées avec la SGI)
+BROKERAGE_RATE = 0.005   # Commission de courtage (0,5%)
+EXCHANGE_RATE = 0.0015   # Frais BRVM et DC/BR (0,15%)
+IMPACT_VALUE = 100000000.0  # Montant de référence de l'impact de marché (100 M FCFA)
+
+
+class CostModel:
+    """Barème de frais d'une transaction de montant v:
+    v * (brokerage_rate + exchange_rate) + v * impact_rate * v / impact_value"""
+
+    def __init__(self, brokerage_rate=BROKERAGE_RATE, exchange_rate=EXCHANGE_RATE,
+                 impact_rate=0.0, impact_value=IMPACT_VALUE, name=None):
+        """Initialisation du barème (taux en fraction du montant échangé)"""
+        if min(brokerage_rate, exchange_rate, impact_rate) < 0 or impact_value <= 0:
+            raise ValueError("Les taux de frais doivent être positifs")
+        self.brokerage_rate = brokerage_rate
+        self.exchange_rate = exchange_rate
+        self.impact_rate = impact_rate
+        self.impact_value = impact_value
+        self.name = name or f"Frais {100 * (brokerage_rate + exchange_rate):.2f}% / Impact {100 * impact_rate:.2f}%"
+
+    def coefficients(self):
+        """Coefficients (linéaire, quadratique) des frais en fonction du montant"""
+        return self.brokerage_rate + self.exchange_rate, self.impact_rate / self.impact_value
+
+    def trade_costs(self, values):
+        """Frais de chaque transaction (montants échangés en valeur absolue)"""
+        linear, quadratic = self.coefficients()
+        values = np.abs(values)
+        return values * (linear + quadratic * values)
+
+
+def _trade_costs(log, models, include_acquisitions):
+    """Frais barèmes x transactions du journal (une seule expression vectorisée)"""
+    values = np.abs(log.values)
+    if not include_acquisitions:
+        values = np.where(log.type_codes == log.TYPES.index('Acquisition'), 0.0, values)
+    coefficients = np.array([model.coefficients() for model in models], dtype=np.float64)
+    return values * (coefficients[:, [0]] + coefficients[:, [1]] * values)
+
+
+def daily_costs(strategy, models, include_acquisitions=True):
+    """Frais par jour de l'historique et par barème (dates x barèmes)"""
+    models = list(models)
+    dates = pd.DatetimeIndex(strategy.portfolio['Date'], name='Date')
+    costs = np.zeros((len(models), len(dates)))
+
+    log = strategy.transactions
+    if len(log):
+        # Transactions triées par date: somme par jour de transaction en un appel
+        trade_costs = _trade_costs(log, models, include_acquisitions)
+        trading_days, first_trades = np.unique(log.dates, return_index=True)
+        positions = dates.get_indexer(pd.DatetimeIndex(trading_days))
+        if (positions < 0).any():
+            raise KeyError("Transactions hors de l'historique du portefeuille")
+        costs[:, positions] = np.add.reduceat(trade_costs, first_trades, axis=1)
+
+    return pd.DataFrame(costs.T, index=dates, columns=[model.name for model in models])
+
+
+def apply_costs(strategy, models, include_acquisitions=True):
+    """VL nette de frais pour chaque barème (dates x barèmes)
+
+    Les frais d'un jour sont prélevés sur l'actif total de ce jour; la perte se
+    propage aux jours suivants au rythme des rendements du portefeuille:
+    VL nette = VL brute * produit cumulé de (1 - frais / actif total)."""
+    costs = daily_costs(strategy, models, include_acquisitions)
+    total_value = np.asarray(strategy.portfolio['Total_Value'], dtype=np.float64)
+    nav = np.asarray(strategy.portfolio['NAV'], dtype=np.float64)
+    factors = np.cumprod(1 - costs.to_numpy().T / total_value, axis=1)
+    return pd.DataFrame((nav * factors).T, index=costs.index, columns=costs.columns)
+
+
+def cost_summary(strategy, models, include_acquisitions=True):
+    """Total des frais et performance nette par barème"""
+    costs = daily_costs(strategy, models, include_acquisitions)
+    nav = apply_costs(strategy, models, include_acquisitions)
+    gross_nav = strategy.portfolio['NAV']
+    return pd.DataFrame({
+        'Total Frais': costs.sum(),
+        'Frais (% actif initial)': costs.sum() / strategy.initial_cash * 100,
+        'Performance Brute (%)': (gross_nav[-1] / gross_nav[0] - 1) * 100,
+        'Performance Nette (%)': (nav.iloc[-1] / strategy.initial_nav - 1) * 100
+    })
@@ -0,0 +1,174 @@
+"""Export des résultats d'un backtest
+
+Les tables longues (États: une ligne par date et titre, Transactions) sont
+construites directement depuis l'historique en colonnes du moteur (matrices
+jours x titres, journal des transactions), sans passer par les DataFrames
+d'état quotidiens.
+
+- export_excel: classeur écrit ligne à ligne par xlsxwriter en mode
+  constant_memory dans un fichier temporaire (mémoire bornée);
+- export_tables: fichiers Parquet, CSV ou JSON par table, sans limite de lignes.
+"""
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# Nombre maximal de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1048576
+STATE_COLUMNS = ['Quantity', 'Price', 'Value', 'Weight', 'Date', 'NAV', 'Total_Value']
+TRANSACTION_COLUMNS = ['Asset', 'Type', 'Quantity', 'Price', 'Value', 'Date']
+PORTFOLIO_COLUMNS = ['Date', 'NAV', 'Total_Value', 'Portfolio_Value', 'Cash',
+                     'Cash_Injections', 'Dividends', 'Costs']
+EXPORT_FORMATS = ('parquet', 'csv', 'json')
+
+
+def _state_columns(strategy):
+    """Colonnes de la table longue des états (ordre: date puis titres de strategy.stocks)"""
+    n_days, n_stocks = len(strategy.portfolio['Date']), len(strategy.stocks)
+    quantities = strategy.holdings['Quantity'][:n_days].astype(np.float64).ravel()
+    prices = strategy.holdings['Price'][:n_days].astype(np.float64).ravel()
+    return {
+        'Asset': np.tile(np.asarray(strategy.stocks, dtype=object), n_days),
+        'Quantity': quantities,
+        'Price': prices,
+        'Value': quantities * prices,
+        'Weight': strategy.holdings['Weight'][:n_days].astype(np.float64).ravel(),
+        'Date': np.repeat(pd.DatetimeIndex(strategy.portfolio['Date']).to_pydatetime(), n_stocks),
+        'NAV': np.repeat(np.asarray(strategy.portfolio['NAV'], dtype=np.float64), n_stocks),
+        'Total_Value': np.repeat(np.asarray(strategy.portfolio['Total_Value'], dtype=np.float64), n_stocks)
+    }
+
+
+def states_table(strategy):
+    """États du portefeuille au format long (une ligne par date et titre)"""
+    columns = _state_columns(strategy)
+    columns['Date'] = pd.DatetimeIndex(columns['Date'])
+    return pd.DataFrame(columns)
+
+
+def portfolio_table(strategy):
+    """Historique quotidien du portefeuille (VL, valorisations, cash, flux)"""
+    return pd.DataFrame({key: strategy.portfolio[key] for key in PORTFOLIO_COLUMNS if key in strategy.portfolio})
+
+
+def metrics_table(metrics):
+    """Métriques au format colonne (Métrique, Valeur)"""
+    return pd.DataFrame({'Métrique': list(metrics.keys()), 'Valeur': list(metrics.values())})
+
+
+def _cell(value):
+    """Valeur écrite par xlsxwriter (cellule vide pour une valeur manquante)"""
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _write_rows(worksheet, header, rows, header_format, date_format, date_columns=()):
+    """Écriture séquentielle d'une feuille (compatible constant_memory)"""
+    worksheet.write_row(0, 0, header, header_format)
+    for column in date_columns:
+        worksheet.set_column(column, column, 20, date_format)
+    for r, row in enumerate(rows, start=1):
+        for c, value in enumerate(row):
+            value = _cell(value)
+            if value is None:
+                continue
+            if c in date_columns:
+                worksheet.write_datetime(r, c, value, date_format)
+            else:
+                worksheet.write(r, c, value)
+
+
+def export_excel(strategy, metrics=None, path=None):
+    """Export Excel (feuilles États, Transactions, Métriques) en mémoire constante
+
+    path: fichier de destination (fichier temporaire par défaut, à supprimer
+    par l'appelant). Renvoie le chemin du classeur écrit."""
+    n_rows = len(strategy.portfolio['Date']) * len(strategy.stocks)
+    if n_rows + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Trop de lignes pour Excel ({n_rows}): utiliser export_tables (Parquet ou CSV)")
+
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(handle)
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+
+        # Export des états (une ligne par date et titre, titre en première colonne)
+        states = _state_columns(strategy)
+        _write_rows(
+            workbook.add_worksheet('États'), [''] + STATE_COLUMNS,
+            zip(states['Asset'], *(states[column] for column in STATE_COLUMNS)),
+            header_format, date_format, date_columns=(1 + STATE_COLUMNS.index('Date'),)
+        )
+
+        # Export des transactions (journal en colonnes, date en dernière colonne)
+        log = strategy.transactions
+        if len(log):
+            _write_rows(
+                workbook.add_worksheet('Transactions'), TRANSACTION_COLUMNS,
+                zip(np.asarray(log.assets, dtype=object)[log.asset_codes],
+                    np.asarray(log.TYPES, dtype=object)[log.type_codes],
+                    log.quantities.tolist(), log.prices.tolist(), log.values.tolist(),
+                    pd.DatetimeIndex(log.dates).to_pydatetime()),
+                header_format, date_format, date_columns=(TRANSACTION_COLUMNS.index('Date'),)
+            )
+
+        # Export des métriques
+        if metrics is not None:
+            _write_rows(workbook.add_worksheet('Métriques'), ['Métrique', 'Valeur'],
+                        metrics.items(), header_format, date_format)
+    finally:
+        workbook.close()
+    return path
+
+
+def check_format(fmt):
+    """Vérification du format d'export (et de pyarrow pour Parquet)"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow), ou utiliser fmt='csv'")
+
+
+def write_table(table, path, fmt):
+    """Écriture d'une table au format Parquet, CSV ou JSON (une ligne par enregistrement)"""
+    if fmt == 'parquet':
+        table.to_parquet(path, index=False)
+    elif fmt == 'csv':
+        table.to_csv(path, index=False)
+    else:
+        table.to_json(path, orient='records', date_format='iso', force_ascii=False)
+
+
+def export_tables(strategy, directory, fmt='csv', metrics=None, prefix=''):
+    """Export des tables (portefeuille, états, transactions, métriques) en Parquet, CSV ou JSON
+
+    Renvoie le dictionnaire table -> chemin du fichier écrit."""
+    check_format(fmt)
+
+    tables = {
+        'portefeuille': portfolio_table(strategy),
+        'etats': states_table(strategy),
+        'transactions': strategy.get_transactions()
+    }
+    if metrics is not None:
+        tables['metriques'] = metrics_table(metrics).astype({'Valeur': 'float64'})
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, table in tables.items():
+        path = os.path.join(directory, f'{prefix}{name}.{fmt}')
+        write_table(table, path, fmt)
+        paths[name] = path
+    return paths
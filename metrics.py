@@ -0,0 +1,219 @@
+"""Métriques de performance vectorisées
+
+Les métriques sont calculées en un appel pour un ensemble de séries de VL
+(tableau exécutions x jours: balayage, bootstrap, variantes groupées) face à un
+benchmark commun (vecteur des jours). Une série unique (vecteur) donne des
+scalaires. Les formules sont celles des stratégies: rendements quotidiens
+simples, volatilités annualisées (écart-type échantillon x racine de 252) et
+taux sans risque annuel de 6%.
+
+Deux définitions du ratio de Sharpe (et de Sortino) coexistent:
+- 'annualized_excess': rendement quotidien excédentaire moyen annualisé
+  rapporté à la volatilité (Strategy2, Strategy3);
+- 'period_return': rendement de la période moins le taux sans risque,
+  rapporté à la volatilité (Strategy4).
+"""
+import warnings
+
+import numpy as np
+
+RISK_FREE_RATE = 0.06  # Taux sans risque annuel (6%)
+TRADING_DAYS = 252
+SHARPE_METHODS = ('annualized_excess', 'period_return')
+
+
+def daily_returns(nav):
+    """Rendements quotidiens simples (exécutions x jours - 1)"""
+    nav = np.asarray(nav, dtype=np.float64)
+    return nav[..., 1:] / nav[..., :-1] - 1
+
+
+def _nanstd(values, axis=-1):
+    """Écart-type échantillon en ignorant les valeurs manquantes (NaN si moins de 2 valeurs)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanstd(values, axis=axis, ddof=1)
+
+
+def _nanmean(values, axis=-1):
+    """Moyenne en ignorant les valeurs manquantes (NaN si aucune valeur)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(values, axis=axis)
+
+
+def _correlation(x, y):
+    """Corrélation de Pearson ligne à ligne sur les observations communes"""
+    valid = np.isfinite(x) & np.isfinite(y)
+    count = valid.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx = np.where(valid, x - np.where(valid, x, 0).sum(axis=-1, keepdims=True) / count[..., None], 0)
+        dy = np.where(valid, y - np.where(valid, y, 0).sum(axis=-1, keepdims=True) / count[..., None], 0)
+        correlation = (dx * dy).sum(axis=-1) / np.sqrt((dx ** 2).sum(axis=-1) * (dy ** 2).sum(axis=-1))
+    return np.where(count >= 2, correlation, np.nan)
+
+
+def performance_metrics(nav, benchmark=None, risk_free_rate=RISK_FREE_RATE,
+                        sharpe_method='annualized_excess'):
+    """Métriques de performance de séries de VL face au benchmark
+
+    nav: VL (jours) ou (exécutions x jours)
+    benchmark: niveaux du benchmark aux mêmes dates (jours), ou None
+               (métriques relatives au benchmark à NaN)
+
+    Renvoie un dictionnaire métrique -> valeur (scalaire) ou tableau (exécutions)."""
+    if sharpe_method not in SHARPE_METHODS:
+        raise ValueError(f"Méthode de Sharpe inconnue: {sharpe_method}")
+    nav = np.asarray(nav, dtype=np.float64)
+    single = nav.ndim == 1
+    nav = np.atleast_2d(nav)
+    if benchmark is None:
+        benchmark = np.full(nav.shape[-1], np.nan)
+    benchmark = np.asarray(benchmark, dtype=np.float64)
+    if benchmark.shape[-1] != nav.shape[-1]:
+        raise ValueError("La VL et le benchmark doivent couvrir les mêmes dates")
+
+    # Rendements de la période et rendements quotidiens
+    portfolio_return = nav[:, -1] / nav[:, 0] - 1
+    benchmark_return = benchmark[-1] / benchmark[0] - 1
+    returns = daily_returns(nav)
+    benchmark_returns = daily_returns(benchmark)
+    daily_rf = (1 + risk_free_rate) ** (1/TRADING_DAYS) - 1
+
+    # Volatilités, corrélation et beta
+    portfolio_vol = _nanstd(returns) * np.sqrt(TRADING_DAYS)
+    benchmark_vol = _nanstd(benchmark_returns) * np.sqrt(TRADING_DAYS)
+    correlation = _correlation(returns, np.broadcast_to(benchmark_returns, returns.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = correlation * (portfolio_vol / benchmark_vol)
+
+        # Tracking error et VaR historique à 99% sur 1 jour
+        tracking_error = _nanstd(returns - benchmark_returns) * np.sqrt(TRADING_DAYS)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            var_99 = np.nanpercentile(returns, 1, axis=-1)
+
+        # Sharpe et Sortino (volatilité des seuls rendements négatifs)
+        if sharpe_method == 'annualized_excess':
+            excess_return = (1 + _nanmean(returns - daily_rf)) ** TRADING_DAYS - 1
+        else:
+            excess_return = portfolio_return - risk_free_rate
+        sharpe_ratio = excess_return / portfolio_vol
+        downside_vol = _nanstd(np.where(returns < 0, returns, np.nan)) * np.sqrt(TRADING_DAYS)
+        sortino_ratio = np.where(downside_vol != 0, excess_return / downside_vol, np.nan)
+
+        # Ratio d'information
+        information_ratio = (portfolio_return - benchmark_return) / tracking_error
+
+    metrics = {
+        'Performance Portefeuille (%)': portfolio_return * 100,
+        'Performance BRVM-C (%)': np.broadcast_to(benchmark_return * 100, portfolio_return.shape),
+        'Surperformance (%)': (portfolio_return - benchmark_return) * 100,
+        'Beta': beta,
+        'Corrélation': correlation,
+        'Tracking Error (%)': tracking_error * 100,
+        'Ratio de Sharpe': sharpe_ratio,
+        'Ratio de Sortino': sortino_ratio,
+        'Ratio d\'Information': information_ratio,
+        'Volatilité Portefeuille (%)': portfolio_vol * 100,
+        'Volatilité Benchmark (%)': np.broadcast_to(benchmark_vol * 100, portfolio_return.shape),
+        'VaR 99% (%)': var_99 * 100
+    }
+    if single:
+        return {name: float(values[0]) for name, values in metrics.items()}
+    return metrics
+
+
+def max_drawdown(nav):
+    """Perte maximale depuis un plus haut (fraction négative) de chaque série"""
+    nav = np.asarray(nav, dtype=np.float64)
+    return (nav / np.maximum.accumulate(nav, axis=-1) - 1).min(axis=-1)
+
+
+def _rolling_sum(values, window):
+    """Sommes glissantes sur `window` observations (dernier axe) par différence
+    de sommes cumulées; NaN tant que la fenêtre n'est pas complète"""
+    zeros = np.zeros(values.shape[:-1] + (1,))
+    cumulative = np.concatenate([zeros, np.cumsum(values, axis=-1)], axis=-1)
+    sums = np.full(values.shape, np.nan)
+    sums[..., window - 1:] = cumulative[..., window:] - cumulative[..., :-window]
+    return sums
+
+
+def rolling_metrics(nav, benchmark=None, window=63, risk_free_rate=RISK_FREE_RATE,
+                    sharpe_method='annualized_excess'):
+    """Métriques glissantes sur `window` rendements quotidiens et drawdowns courants
+
+    Chaque fenêtre est obtenue en O(1) à partir des sommes cumulées des
+    rendements, des carrés et des produits croisés (rendements centrés pour la
+    stabilité numérique); le drawdown utilise le plus haut courant. Les valeurs
+    sont alignées sur les jours de la VL (NaN tant que la fenêtre est incomplète);
+    les rendements manquants sont ignorés dans chaque fenêtre.
+
+    Avec 'period_return', le rendement de la fenêtre est annualisé avant de
+    retrancher le taux sans risque annuel (la formule de la période complète le
+    retranche tel quel, ce qui biaiserait les fenêtres courtes).
+
+    nav: VL (jours) ou (exécutions x jours); benchmark: niveaux aux mêmes dates ou None
+
+    Renvoie un dictionnaire métrique -> tableau de la forme de nav."""
+    if sharpe_method not in SHARPE_METHODS:
+        raise ValueError(f"Méthode de Sharpe inconnue: {sharpe_method}")
+    nav = np.asarray(nav, dtype=np.float64)
+    if window < 2 or window >= nav.shape[-1]:
+        raise ValueError(f"Fenêtre invalide ({window} jours) pour {nav.shape[-1]} dates")
+    if benchmark is None:
+        benchmark = np.full(nav.shape[-1], np.nan)
+    benchmark = np.broadcast_to(np.asarray(benchmark, dtype=np.float64), nav.shape)
+    daily_rf = (1 + risk_free_rate) ** (1/TRADING_DAYS) - 1
+
+    def moments(x, y=None):
+        """Effectif, moyenne, variance (et covariance avec y) glissants"""
+        valid = np.isfinite(x) if y is None else np.isfinite(x) & np.isfinite(y)
+        n = _rolling_sum(valid.astype(np.float64), window)
+        x_mean = _nanmean(np.where(valid, x, np.nan))[..., None]
+        dx = np.where(valid, x - x_mean, 0.0)
+        sx = _rolling_sum(dx, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sx / n + x_mean
+            variance = np.maximum(_rolling_sum(dx ** 2, window) - sx ** 2 / n, 0.0) / (n - 1)
+            if y is None:
+                return n, mean, np.where(n >= 2, variance, np.nan)
+            y_mean = _nanmean(np.where(valid, y, np.nan))[..., None]
+            dy = np.where(valid, y - y_mean, 0.0)
+            sy = _rolling_sum(dy, window)
+            covariance = (_rolling_sum(dx * dy, window) - sx * sy / n) / (n - 1)
+            y_variance = np.maximum(_rolling_sum(dy ** 2, window) - sy ** 2 / n, 0.0) / (n - 1)
+            return n, mean, np.where(n >= 2, variance, np.nan), covariance, y_variance
+
+    returns = daily_returns(nav)
+    benchmark_returns = daily_returns(benchmark)
+    _, mean, variance = moments(returns)
+    _, _, _, covariance, benchmark_variance = moments(returns, benchmark_returns)
+    _, _, active_variance = moments(returns - benchmark_returns)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.sqrt(variance) * np.sqrt(TRADING_DAYS)
+        if sharpe_method == 'annualized_excess':
+            excess_return = (1 + mean - daily_rf) ** TRADING_DAYS - 1
+        else:
+            excess_return = np.full(returns.shape, np.nan)
+            window_return = nav[..., window:] / nav[..., :-window]
+            excess_return[..., window - 1:] = window_return ** (TRADING_DAYS / window) - 1 - risk_free_rate
+        sharpe_ratio = excess_return / volatility
+        beta = covariance / benchmark_variance
+    tracking_error = np.sqrt(active_variance) * np.sqrt(TRADING_DAYS)
+
+    # Alignement sur les jours de la VL (le premier jour n'a pas de rendement)
+    def align(values):
+        return np.concatenate([np.full(values.shape[:-1] + (1,), np.nan), values], axis=-1)
+
+    underwater = nav / np.maximum.accumulate(nav, axis=-1) - 1
+    return {
+        'Volatilité (%)': align(volatility) * 100,
+        'Ratio de Sharpe': align(sharpe_ratio),
+        'Beta': align(beta),
+        'Tracking Error (%)': align(tracking_error) * 100,
+        'Drawdown (%)': underwater * 100,
+        'Drawdown Max (%)': np.minimum.accumulate(underwater, axis=-1) * 100
+    }
@@ -0,0 +1,147 @@
+"""Robustesse des stratégies par bootstrap des rendements historiques
+
+Des trajectoires de prix synthétiques sont tirées par bootstrap par blocs
+(circulaire) sur la matrice des rendements quotidiens de Asset2: chaque bloc
+reprend des jours consécutifs pour tous les titres à la fois, ce qui conserve
+l'autocorrélation de court terme et les corrélations entre titres. Les règles de
+rééquilibrage de la stratégie sont appliquées à toutes les trajectoires d'un
+lot en une passe (voir BatchBacktest); les dividendes restent ceux du
+calendrier historique (montant par action).
+
+Les trajectoires sont générées par lots de taille fixe (mémoire bornée): seuls
+les débuts de blocs sont tirés pour toutes les trajectoires, les indices des
+jours et les prix n'existent que pour le lot en cours. Les tirages dépendent
+uniquement de la graine: les résultats sont reproductibles quelle que soit la
+taille des lots.
+
+Exemple:
+    results = run_bootstrap(Strategy2, asset, '2024-01-01', '2025-04-30',
+                            n_paths=2000, block_size=20, seed=42)
+    summarize_distribution(results)
+"""
+import numpy as np
+import pandas as pd
+
+from BatchBacktest import BatchBacktest
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Résultats conservés par trajectoire (sans benchmark sur trajectoires synthétiques)
+PATH_METRICS = [
+    'Performance Portefeuille (%)', 'Drawdown Max (%)', 'Volatilité Portefeuille (%)',
+    'Ratio de Sharpe', 'Ratio de Sortino', 'VaR 99% (%)',
+    'Total Dividendes', 'Nombre Rebalancements'
+]
+
+
+class PathBatchBacktest(BatchBacktest):
+    """Simulation groupée d'une stratégie sur des trajectoires de prix synthétiques
+
+    template: portefeuille du premier jour de la stratégie (history=False),
+              répliqué sur chaque trajectoire
+    price_paths: prix trajectoires x jours x titres (ordre de template.stocks),
+                 le jour 0 étant la date de début
+    """
+
+    def __init__(self, template, price_paths):
+        """Initialisation et exécution sur toutes les trajectoires"""
+        self.template = template
+        self.price_paths = price_paths
+        super().__init__(type(template), [{}] * len(price_paths), template.initial_cash,
+                         template.initial_nav, template.start_date, template.end_date, template.asset)
+
+    def _initial_portfolios(self, start_date, end_date):
+        """Portefeuille initial commun à toutes les trajectoires"""
+        return [self.template], [0] * len(self.variants)
+
+    def _day_prices(self, day, row):
+        """Prix du jour de chaque trajectoire (trajectoires x titres)"""
+        return self.price_paths[:, day]
+
+    def _benchmark(self):
+        """Pas de benchmark sur trajectoires synthétiques (métriques relatives à NaN)"""
+        return None
+
+
+def _history_returns(asset, columns, history_start=None, history_end=None):
+    """Rendements historiques des titres sur la période d'échantillonnage
+    (rendements manquants à 0: cours inchangé)"""
+    rows = np.ones(len(asset.dates), dtype=bool)
+    rows[0] = False
+    if history_start is not None:
+        rows &= asset.dates >= pd.to_datetime(history_start)
+    if history_end is not None:
+        rows &= asset.dates <= pd.to_datetime(history_end)
+    returns = asset.return_matrix()[rows][:, columns]
+    if len(returns) == 0:
+        raise ValueError("Aucun rendement historique sur la période d'échantillonnage")
+    return np.nan_to_num(returns, nan=0.0)
+
+
+def block_bootstrap_starts(n_history, n_days, n_paths, block_size, rng):
+    """Jours de début des blocs tirés (trajectoires x blocs) par bootstrap par blocs circulaire"""
+    n_blocks = -(-n_days // block_size)
+    return rng.integers(0, n_history, size=(n_paths, n_blocks))
+
+
+def block_bootstrap_indices(starts, n_history, n_days, block_size):
+    """Indices des jours tirés (trajectoires x jours) à partir des débuts de blocs"""
+    indices = (starts[:, :, None] + np.arange(block_size)) % n_history
+    return indices.reshape(len(starts), -1)[:, :n_days]
+
+
+def run_bootstrap(strategy_class, asset, start_date, end_date, params=None,
+                  n_paths=1000, block_size=20, chunk_size=250, seed=0,
+                  initial_cash=90000000.0, initial_nav=100.0,
+                  history_start=None, history_end=None):
+    """Distribution des résultats d'une stratégie sur des trajectoires bootstrap
+
+    params: paramètres du constructeur de la stratégie
+    block_size: longueur des blocs de jours consécutifs
+    chunk_size: nombre de trajectoires simulées ensemble (borne la mémoire)
+    history_start, history_end: période des rendements échantillonnés (tout l'historique par défaut)
+
+    Renvoie un DataFrame: une ligne par trajectoire (VL finale, drawdown, Sharpe...);
+    le Sharpe suit la définition de la stratégie (voir metrics)."""
+    if block_size < 1 or chunk_size < 1:
+        raise ValueError("block_size et chunk_size doivent être positifs")
+
+    # Portefeuille initial et calendrier communs à toutes les trajectoires
+    template = strategy_class(initial_cash, initial_nav, start_date, end_date, asset,
+                              history=False, **(params or {}))
+    n_days = len(template._backtest_dates())
+    returns = _history_returns(asset, template._columns, history_start, history_end)
+    start_prices = asset.prices[asset.get_row(template.start_date), template._columns]
+
+    # Tirages fixés par la graine pour toutes les trajectoires (débuts de blocs
+    # seulement, les indices des jours sont développés lot par lot)
+    rng = np.random.default_rng(seed)
+    starts = block_bootstrap_starts(len(returns), n_days, n_paths, block_size, rng)
+
+    results = []
+    for start in range(0, n_paths, chunk_size):
+        # Trajectoires du lot: prix de départ puis rendements cumulés
+        indices = block_bootstrap_indices(starts[start:start + chunk_size], len(returns), n_days, block_size)
+        growth = np.cumprod(1 + returns[indices], axis=1)
+        price_paths = np.concatenate([
+            np.broadcast_to(start_prices, (len(growth), 1, len(start_prices))),
+            start_prices * growth
+        ], axis=1)
+
+        batch = PathBatchBacktest(template, price_paths)
+        summary = batch.get_summary()[PATH_METRICS]
+        summary.insert(0, 'VL Finale', batch.portfolio['NAV'][:, -1])
+        summary.index = pd.RangeIndex(start, start + len(growth), name='Trajectoire')
+        results.append(summary)
+
+    return pd.concat(results)
+
+
+def summarize_distribution(results, quantiles=QUANTILES):
+    """Moyenne, écart-type et quantiles de chaque résultat sur les trajectoires"""
+    summary = results.quantile(list(quantiles)).rename(index=lambda q: f'{q:.0%}')
+    return pd.concat([
+        results.mean().to_frame('Moyenne').T,
+        results.std().to_frame('Écart-type').T,
+        summary
+    ])
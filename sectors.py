@@ -0,0 +1,118 @@
+"""Expositions sectorielles du portefeuille
+
+La classification sectorielle (SECTORS) est traduite une fois en matrice
+d'appartenance titres x secteurs; les poids sectoriels de chaque jour du
+backtest s'obtiennent alors par un seul produit matriciel avec l'historique des
+poids (jours x titres). Les dépassements des bandes cible ± déviation
+(SECTOR_METRICS) sont repérés sur tout l'historique.
+"""
+import numpy as np
+import pandas as pd
+
+SECTORS = {
+    'SERVICES PUBLICS': ['SNTS', 'ORAC', 'SDCC', 'ONTBF', 'CIEC'],
+    'FINANCES': ['BOAB', 'BOABF', 'BOAC', 'BOAM', 'BOAN', 'BOAS', 'CBIBF', 'ECOC', 'ETIT',
+                'NSBC', 'ORGT', 'SAFC', 'SGBC', 'SIBC', 'BICB'],
+    'INDUSTRIE': ['SIVC', 'SEMC', 'FTSC', 'NEIC', 'NTLC', 'CABC', 'STBC', 'SMBC', 'SLBC',
+                 'UNLC', 'UNXC'],
+    'DISTRIBUTIONS': ['BNBC', 'CFAC', 'ABJC', 'TTLC', 'TTLS', 'PRSC', 'SHEC'],
+    'AGRICULTURE': ['PALC', 'SPHC', 'SICC', 'SOGC', 'SCRC'],
+    'AUTRES SECTEURS': ['STAC', 'LNBB'],
+    'TRANSPORT': ['SDSC', 'SVOC']
+}
+
+SECTOR_METRICS = {
+    'SERVICES PUBLICS': {'market_weight': 0.464, 'target': 0.50, 'deviation': 0.20},
+    'FINANCES': {'market_weight': 0.363, 'target': 0.30, 'deviation': 0.15},
+    'INDUSTRIE': {'market_weight': 0.078, 'target': 0.10, 'deviation': 0.05},
+    'DISTRIBUTIONS': {'market_weight': 0.045, 'target': 0.025, 'deviation': 0.05},
+    'AGRICULTURE': {'market_weight': 0.035, 'target': 0.025, 'deviation': 0.05},
+    'AUTRES SECTEURS': {'market_weight': 0.009, 'target': 0.025, 'deviation': 0.05},
+    'TRANSPORT': {'market_weight': 0.007, 'target': 0.025, 'deviation': 0.05}
+}
+
+
+def membership_matrix(stocks, sectors=SECTORS):
+    """Matrice titres x secteurs (1 si le titre appartient au secteur)
+
+    Toutes les lignes d'un titre présent plusieurs fois sont rattachées à son
+    secteur: les expositions restent la somme des poids des titres."""
+    index = pd.Index(stocks)
+    membership = np.zeros((len(index), len(sectors)))
+    for j, members in enumerate(sectors.values()):
+        rows = index.get_indexer_for(members)
+        membership[rows[rows >= 0], j] = 1.0
+    return pd.DataFrame(membership, index=list(stocks), columns=list(sectors))
+
+
+def sector_weights(weights, sectors=SECTORS):
+    """Poids sectoriels à partir de poids par titre
+
+    weights: Series (titres) ou DataFrame (dates x titres)
+    Un poids manquant (cours absent) rend manquant le poids de son secteur.
+    Renvoie une Series (secteurs) ou un DataFrame (dates x secteurs)."""
+    frame = weights.to_frame().T if isinstance(weights, pd.Series) else weights
+    membership = membership_matrix(frame.columns, sectors).to_numpy()
+    values = frame.to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+
+    # Un produit matriciel pour toutes les dates
+    exposures = np.where(missing, 0.0, values) @ membership
+    exposures[(missing.astype(np.float64) @ membership) > 0] = np.nan
+    result = pd.DataFrame(exposures, index=frame.index, columns=list(sectors))
+    return result.iloc[0] if isinstance(weights, pd.Series) else result
+
+
+def sector_weight_history(strategy, sectors=SECTORS):
+    """Poids sectoriels de chaque jour du backtest (dates x secteurs)"""
+    return sector_weights(strategy.get_holdings_history('Weight'), sectors)
+
+
+def sector_bands(sector_metrics=SECTOR_METRICS):
+    """Bandes autorisées par secteur: cible ± déviation (secteurs x Minimum, Maximum)"""
+    metrics = pd.DataFrame(sector_metrics).T
+    return pd.DataFrame({
+        'Minimum': metrics['target'] - metrics['deviation'],
+        'Maximum': metrics['target'] + metrics['deviation']
+    })
+
+
+def sector_breaches(exposures, sector_metrics=SECTOR_METRICS):
+    """Dépassements des bandes sectorielles (dates x secteurs: -1 sous la bande,
+    1 au-dessus, 0 dans la bande ou poids manquant)"""
+    bands = sector_bands(sector_metrics).reindex(exposures.columns)
+    values = exposures.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        breaches = ((values > bands['Maximum'].to_numpy()).astype(np.int8) -
+                    (values < bands['Minimum'].to_numpy()).astype(np.int8))
+    return pd.DataFrame(breaches, index=exposures.index, columns=exposures.columns)
+
+
+def breach_timeline(exposures, sector_metrics=SECTOR_METRICS):
+    """Épisodes de dépassement: une ligne par période continue hors bande
+    (secteur, sens, début, fin, nombre de jours et poids extrême)"""
+    breaches = sector_breaches(exposures, sector_metrics)
+    values = breaches.to_numpy()
+    dates = breaches.index
+
+    # Débuts et fins d'épisodes par changement d'état (bordures à 0)
+    padded = np.vstack([np.zeros((1, values.shape[1]), dtype=np.int8), values,
+                        np.zeros((1, values.shape[1]), dtype=np.int8)])
+    changes = np.diff(padded, axis=0) != 0
+    episodes = []
+    for j, sector in enumerate(breaches.columns):
+        bounds = np.flatnonzero(changes[:, j])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            side = values[start, j]
+            if side == 0:
+                continue
+            weights = exposures.iloc[start:end, j]
+            episodes.append({
+                'Secteur': sector,
+                'Sens': 'Au-dessus' if side > 0 else 'En dessous',
+                'Début': dates[start],
+                'Fin': dates[end - 1],
+                'Jours': end - start,
+                'Poids Extrême (%)': (weights.max() if side > 0 else weights.min()) * 100
+            })
+    return pd.DataFrame(episodes, columns=['Secteur', 'Sens', 'Début', 'Fin', 'Jours', 'Poids Extrême (%)'])
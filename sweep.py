@@ -0,0 +1,139 @@
+"""Balayage de paramètres des stratégies sur un pool de processus
+
+Chaque processus charge une seule fois les données (Asset2) puis exécute un
+backtest par combinaison de paramètres. Les résultats sont rassemblés dans une
+table: une ligne par combinaison, les paramètres puis les métriques de
+performance.
+
+Exemple:
+    results = run_sweep(
+        'Strategy2',
+        {'drift_tolerance': [0.01, 0.02, 0.03], 'cash_threshold': [0.05, 0.10]},
+        'cours.xlsx', 'Dividendes.xlsx', '2024-01-01', '2025-04-30'
+    )
+
+Pour de nombreuses variantes d'une même stratégie, run_batch_sweep les simule
+ensemble en un seul passage vectorisé (voir BatchBacktest).
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from Asset2 import Asset2, CACHE_DIR
+from BatchBacktest import BatchBacktest
+from Strategy2 import Strategy2
+from Strategy3 import Strategy3
+from Strategy4 import Strategy4
+
+STRATEGIES = {
+    'Strategy2': Strategy2,
+    'Strategy3': Strategy3,
+    'Strategy4': Strategy4
+}
+
+# Données chargées une fois par processus (voir _init_worker)
+_worker_asset = None
+
+
+def _init_worker(price_file, dividend_file, cache_dir):
+    """Chargement des données dans le processus de calcul"""
+    global _worker_asset
+    _worker_asset = Asset2(price_file, dividend_file, cache_dir=cache_dir)
+
+
+def worker_asset():
+    """Données chargées dans le processus courant par _init_worker"""
+    return _worker_asset
+
+
+def worker_pool(price_file, dividend_file, max_workers=None, cache_dir=CACHE_DIR):
+    """Pool de processus chargeant chacun une fois les données (Asset2)"""
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                               initargs=(price_file, dividend_file, cache_dir))
+
+
+def parameter_grid(grid):
+    """Produit cartésien d'une grille {paramètre: [valeurs]} en liste de combinaisons"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _flatten_parameters(params):
+    """Paramètres à plat pour la table de résultats (un poids fixe par colonne)"""
+    flat = {}
+    for name, value in params.items():
+        if isinstance(value, dict):
+            for stock, weight in value.items():
+                flat[f'{name}.{stock}'] = weight
+        else:
+            flat[name] = value
+    return flat
+
+
+def run_backtest(strategy, params, initial_cash, initial_nav, start_date, end_date, asset=None):
+    """Exécute un backtest et renvoie paramètres et métriques sur une ligne
+
+    Une combinaison invalide (ex: titres insuffisants) est signalée dans la
+    colonne 'Erreur' sans interrompre le balayage."""
+    asset = asset if asset is not None else _worker_asset
+    row = {'Stratégie': strategy, **_flatten_parameters(params)}
+    try:
+        result = STRATEGIES[strategy](
+            initial_cash, initial_nav, start_date, end_date, asset,
+            event_driven=True, **params
+        )
+        row.update(result.get_performance_metrics())
+        row['Erreur'] = None
+    except Exception as e:
+        row['Erreur'] = str(e)
+    return row
+
+
+def _run_task(task):
+    """Point d'entrée d'une combinaison dans le pool"""
+    return run_backtest(*task)
+
+
+def run_sweep(strategy, grid, price_file, dividend_file, start_date, end_date,
+              initial_cash=90000000.0, initial_nav=100.0, max_workers=None,
+              cache_dir=CACHE_DIR):
+    """Balayage d'une grille de paramètres pour une stratégie
+
+    strategy: nom de la stratégie ('Strategy2', 'Strategy3' ou 'Strategy4')
+    grid: {paramètre du constructeur: [valeurs]}, par exemple drift_tolerance,
+          cash_threshold, free_weight_cap ou fixed_weights (liste de dicts)
+    price_file, dividend_file: chemins des classeurs (chargés une fois par processus)
+    max_workers: nombre de processus (1 pour une exécution dans le processus courant)
+
+    Renvoie un DataFrame: une ligne par combinaison (paramètres et métriques)."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue: {strategy}")
+    tasks = [
+        (strategy, params, initial_cash, initial_nav, start_date, end_date)
+        for params in parameter_grid(grid)
+    ]
+
+    if max_workers == 1:
+        asset = Asset2(price_file, dividend_file, cache_dir=cache_dir)
+        return pd.DataFrame([run_backtest(*task, asset=asset) for task in tasks])
+
+    with worker_pool(price_file, dividend_file, max_workers, cache_dir) as pool:
+        return pd.DataFrame(list(pool.map(_run_task, tasks)))
+
+
+def run_batch_sweep(strategy, grid, asset, start_date, end_date,
+                    initial_cash=90000000.0, initial_nav=100.0):
+    """Balayage d'une grille simulée en un seul passage (variantes empilées)
+
+    asset: données déjà chargées (Asset2)
+
+    Renvoie un DataFrame: une ligne par combinaison (paramètres et résultats)."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue: {strategy}")
+    variants = parameter_grid(grid)
+    batch = BatchBacktest(STRATEGIES[strategy], variants, initial_cash, initial_nav,
+                          start_date, end_date, asset)
+    parameters = pd.DataFrame([_flatten_parameters(params) for params in variants], index=batch.get_summary().index)
+    parameters.insert(0, 'Stratégie', strategy)
+    return parameters.join(batch.get_summary())
@@ -0,0 +1,111 @@
+"""Non-régression: les modes d'exécution reproduisent le backtest quotidien
+
+Sur des données synthétiques (benchmark_suite), la VL, les flux et le journal
+des transactions de Strategy2/3/4 doivent être identiques (à 1e-12 près) en
+mode quotidien, en mode événementiel et après reprise d'un point de sauvegarde
+(save_checkpoint, load_checkpoint, extend); la simulation groupée
+(BatchBacktest) doit reproduire chaque exécution individuelle.
+
+Les valeurs de référence (VL tous les 52 jours et au dernier jour, somme des
+VL, nombre de rééquilibrages, dividendes) ont été relevées avec le code
+d'origine, avant l'introduction de BacktestEngine (Strategy4 avec le corps de
+__init__ réindenté, la version d'origine ne s'exécutant pas).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Asset2 import Asset2
+from BatchBacktest import BatchBacktest
+from benchmark_suite import write_workbooks
+from Strategy2 import Strategy2
+from Strategy3 import Strategy3
+from Strategy4 import Strategy4
+
+START, CHECKPOINT, END = '2022-01-03', '2022-12-30', '2023-12-29'
+RTOL = 1e-12
+STRATEGIES = [Strategy2, Strategy3, Strategy4]
+PORTFOLIO_KEYS = ['NAV', 'Total_Value', 'Portfolio_Value', 'Cash', 'Cash_Injections', 'Dividends']
+
+# Référence: (VL tous les 52 jours puis dernière VL, somme des VL, rééquilibrages, dividendes)
+REFERENCE = {
+    Strategy2: ([100.0, 113.45964756523392, 107.77603297438267, 95.05622538016695, 94.26212047244329,
+                 95.9443832705298, 92.49307187449648, 95.5413864796826, 103.83764476864505,
+                 119.98248944725749, 135.73272271737656],
+                53184.08698877401, 10, 11134073.310442839),
+    Strategy3: ([100.0, 111.21549598731988, 103.54656312220922, 95.97654960147604, 95.72265290788123,
+                 100.61194956632039, 95.3543892745018, 98.38083746535567, 92.67312389794336,
+                 87.12616005564965, 88.96953853448855],
+                50601.97784077894, 6, 8852787.761104297),
+    Strategy4: ([100.0, 112.61032598627696, 107.77740015188886, 99.5628049751327, 98.79726175091433,
+                 100.42927699439804, 96.88008580217286, 100.16359772330233, 89.92120471143157,
+                 85.71941552113613, 88.1851929593593],
+                51266.59952075223, 5, 11127846.890827494)
+}
+
+
+@pytest.fixture(scope='module')
+def asset(tmp_path_factory):
+    """Données synthétiques de type BRVM (4 années, dividendes semestriels)"""
+    price_file, dividend_file = write_workbooks(tmp_path_factory.mktemp('donnees'), years=4, frequency=2)
+    return Asset2(price_file, dividend_file, cache_dir=None)
+
+
+def assert_same_backtest(result, expected, rtol=RTOL):
+    """VL, flux, positions et journal des transactions identiques"""
+    assert list(result.portfolio['Date']) == list(expected.portfolio['Date'])
+    for key in PORTFOLIO_KEYS:
+        np.testing.assert_allclose(result.portfolio[key], expected.portfolio[key], rtol=rtol, err_msg=key)
+    np.testing.assert_allclose(result.get_holdings_history('Quantity'), expected.get_holdings_history('Quantity'),
+                               rtol=rtol)
+    pd.testing.assert_frame_equal(result.get_transactions(), expected.get_transactions(), rtol=rtol)
+
+
+@pytest.mark.parametrize('strategy_class', STRATEGIES)
+def test_matches_reference_values(asset, strategy_class):
+    nav_path, nav_sum, rebalances, dividends = REFERENCE[strategy_class]
+    strategy = strategy_class(90000000.0, 100.0, START, END, asset)
+    nav = np.asarray(strategy.portfolio['NAV'], dtype=np.float64)
+    assert len(nav) == 520
+    np.testing.assert_allclose(np.append(nav[::52], nav[-1]), nav_path, rtol=1e-10)
+    assert nav.sum() == pytest.approx(nav_sum, rel=1e-10)
+    assert strategy.transactions.rebalance_count() == rebalances
+    assert np.sum(strategy.portfolio['Dividends']) == pytest.approx(dividends, rel=1e-10)
+
+
+@pytest.mark.parametrize('strategy_class', STRATEGIES)
+def test_event_driven_matches_daily(asset, strategy_class):
+    daily = strategy_class(90000000.0, 100.0, START, END, asset)
+    event_driven = strategy_class(90000000.0, 100.0, START, END, asset, event_driven=True)
+    assert len(daily.transactions) > len(daily.stocks)  # rééquilibrages en cours de période
+    assert_same_backtest(event_driven, daily)
+
+
+@pytest.mark.parametrize('strategy_class', STRATEGIES)
+def test_checkpoint_extend_matches_full_run(asset, strategy_class, tmp_path):
+    full = strategy_class(90000000.0, 100.0, START, END, asset)
+    partial = strategy_class(90000000.0, 100.0, START, CHECKPOINT, asset)
+    partial.save_checkpoint(tmp_path / 'point.pkl')
+
+    resumed = strategy_class.load_checkpoint(tmp_path / 'point.pkl', asset)
+    resumed.extend(END)
+    assert_same_backtest(resumed, full)
+
+
+@pytest.mark.parametrize('strategy_class, variants', [
+    (Strategy2, [{}, {'drift_tolerance': 0.01, 'cash_threshold': 0.05},
+                 {'fixed_weights': {'ORAC': 0.2, 'SNTS': 0.2, 'SGBC': 0.05, 'BOAC': 0.05}}]),
+    (Strategy3, [{}, {'drift_tolerance': 0.01, 'free_weight_cap': 0.03}]),
+    (Strategy4, [{}, {'drift_tolerance': 0.04, 'cash_threshold': 0.06},
+                 {'fixed_weights': {'ORAC': 0.15, 'SNTS': 0.15, 'SGBC': 0.05, 'ECOC': 0.05, 'CASH': 0.2}}])
+])
+def test_batch_matches_single_runs(asset, strategy_class, variants):
+    batch = BatchBacktest(strategy_class, variants, 90000000.0, 100.0, START, END, asset)
+    for variant, params in enumerate(variants):
+        single = strategy_class(90000000.0, 100.0, START, END, asset, **params)
+        assert len(set(single.stocks)) == len(single.stocks)  # titres fixes exclus de la sélection
+        for key in PORTFOLIO_KEYS:
+            np.testing.assert_allclose(batch.portfolio[key][variant], single.portfolio[key],
+                                       rtol=1e-10, err_msg=f'{variant} {key}')
+        assert batch.rebalance_days[variant] == single.transactions.rebalance_count()
+        assert batch.traded_value[variant] == pytest.approx(single.transactions.traded_value(by='Asset').sum())
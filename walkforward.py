@@ -0,0 +1,119 @@
+"""Backtests à dates de début glissantes (sensibilité à la date de départ)
+
+Une stratégie est lancée depuis chaque début de mois d'une période, une seule
+fois par date de début, jusqu'au plus long horizon demandé; les résultats des
+horizons plus courts sont lus sur la même série de VL. Les fenêtres étant
+indépendantes, elles sont réparties sur un pool de processus qui chargent
+chacun une seule fois les données (voir sweep.worker_pool). Les classements de
+titres des dates de début sont précalculés par Asset2 (build_screening_calendar).
+
+Exemple:
+    results = run_walk_forward('Strategy2', 'cours.xlsx', 'Dividendes.xlsx',
+                               '2022-01-01', '2024-06-01', horizons=(3, 6, 12))
+    walk_forward_matrix(results, 'Performance Portefeuille (%)')
+"""
+import numpy as np
+import pandas as pd
+
+from Asset2 import Asset2, CACHE_DIR
+from metrics import performance_metrics, max_drawdown
+from sweep import STRATEGIES, worker_asset, worker_pool
+
+HORIZONS = (3, 6, 12)
+
+
+def start_dates(asset, first_start, last_start, freq='MS'):
+    """Dates de début: premier jour de cotation de chaque période (début de mois par défaut)"""
+    starts = [
+        asset.next_available_date(date)
+        for date in pd.date_range(pd.to_datetime(first_start), pd.to_datetime(last_start), freq=freq)
+    ]
+    return pd.DatetimeIndex([date for date in dict.fromkeys(starts) if date is not None])
+
+
+def _window_metrics(nav, benchmark, sharpe_method):
+    """Métriques d'une fenêtre (tableaux de VL et de benchmark) et drawdown maximal"""
+    metrics = performance_metrics(nav, benchmark, sharpe_method=sharpe_method)
+    metrics['Drawdown Max (%)'] = max_drawdown(nav) * 100
+    return metrics
+
+
+def run_window(strategy, start_date, horizons, params, initial_cash, initial_nav, asset=None):
+    """Backtest depuis une date de début et résultats pour chaque horizon (en mois)
+
+    Renvoie une ligne par horizon couvert par les données."""
+    asset = asset if asset is not None else worker_asset()
+    start_date = pd.to_datetime(start_date)
+    ends = {horizon: start_date + pd.DateOffset(months=horizon) for horizon in horizons}
+    ends = {horizon: end for horizon, end in ends.items() if end <= asset.dates[-1]}
+    if not ends:
+        return []
+
+    try:
+        result = STRATEGIES[strategy](
+            initial_cash, initial_nav, start_date, max(ends.values()), asset,
+            event_driven=True, **params
+        )
+    except Exception as e:
+        return [{'Stratégie': strategy, 'Début': start_date, 'Horizon (mois)': horizon, 'Erreur': str(e)}
+                for horizon in ends]
+
+    dates = pd.DatetimeIndex(result.portfolio['Date'])
+    nav = np.asarray(result.portfolio['NAV'], dtype=np.float64)
+    rows = asset.dates.get_indexer(dates)
+    benchmark = asset.benchmark[rows]
+
+    windows = []
+    for horizon, end in ends.items():
+        last = np.searchsorted(dates.values, np.datetime64(end, 'ns'), side='right')
+        windows.append({
+            'Stratégie': strategy,
+            'Début': dates[0],
+            'Horizon (mois)': horizon,
+            'Fin': dates[last - 1],
+            **_window_metrics(nav[:last], benchmark[:last], result.SHARPE_METHOD),
+            'Erreur': None
+        })
+    return windows
+
+
+def _run_task(task):
+    """Point d'entrée d'une date de début dans le pool"""
+    return run_window(*task)
+
+
+def run_walk_forward(strategy, price_file, dividend_file, first_start, last_start,
+                     horizons=HORIZONS, params=None, initial_cash=90000000.0,
+                     initial_nav=100.0, freq='MS', max_workers=None, cache_dir=CACHE_DIR):
+    """Backtests glissants d'une stratégie
+
+    first_start, last_start: période des dates de début (une par mois par défaut)
+    horizons: durées des fenêtres en mois
+    params: paramètres du constructeur de la stratégie (voir sweep)
+    max_workers: nombre de processus (1 pour une exécution dans le processus courant)
+
+    Renvoie un DataFrame: une ligne par date de début et horizon."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue: {strategy}")
+    params = dict(params or {})
+    horizons = sorted(horizons)
+
+    asset = Asset2(price_file, dividend_file, cache_dir=cache_dir)
+    starts = start_dates(asset, first_start, last_start, freq)
+    tasks = [(strategy, start, horizons, params, initial_cash, initial_nav) for start in starts]
+
+    if max_workers == 1:
+        # Classements précalculés hors titres à poids fixe (défaut de Asset2 si non précisés)
+        fixed_weights = params.get('fixed_weights')
+        excluded = None if fixed_weights is None else [stock for stock in fixed_weights if stock != 'CASH']
+        asset.build_screening_calendar(starts, excluded=excluded)
+        windows = [run_window(*task, asset=asset) for task in tasks]
+    else:
+        with worker_pool(price_file, dividend_file, max_workers, cache_dir) as pool:
+            windows = list(pool.map(_run_task, tasks))
+    return pd.DataFrame([window for rows in windows for window in rows])
+
+
+def walk_forward_matrix(results, metric='Performance Portefeuille (%)'):
+    """Matrice dates de début x horizons d'une métrique"""
+    return results.pivot(index='Début', columns='Horizon (mois)', values=metric)